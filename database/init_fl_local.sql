@@ -195,6 +195,11 @@ CREATE TABLE IF NOT EXISTS fl_contributions (
     training_time INTEGER, 
     gas_used BIGINT,
     blockchain_tx_hash VARCHAR(66),
+    model_commitment_root VARCHAR(64),
+    model_commitment_field VARCHAR(78),
+    model_n_weights INTEGER,
+    model_chunk_size INTEGER,
+    model_layout JSONB,
     submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     verified_at TIMESTAMP
 );
@@ -0,0 +1,10 @@
+-- Migration to store the full-model Merkle commitment with each contribution
+-- The ZK proof only covers a slice of the weights; the root lets the whole
+-- update on IPFS be checked against what the server verified at submission
+
+ALTER TABLE fl_contributions
+ADD COLUMN IF NOT EXISTS model_commitment_root VARCHAR(64),
+ADD COLUMN IF NOT EXISTS model_commitment_field VARCHAR(78),
+ADD COLUMN IF NOT EXISTS model_n_weights INTEGER,
+ADD COLUMN IF NOT EXISTS model_chunk_size INTEGER,
+ADD COLUMN IF NOT EXISTS model_layout JSONB;
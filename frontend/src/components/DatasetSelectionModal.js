@@ -200,7 +200,7 @@ function DatasetSelectionModal({ modelId, disease, onClose, onTrainingComplete }
 
             if (!finalResult) throw new Error('Training finished but no results were returned');
 
-            const { modelWeights, metrics } = finalResult;
+            const { modelWeights, zkArtifact, metrics } = finalResult;
 
             setProgress({ status: 'submitting', progress: 95, step: 'Submitting to blockchain...' });
 
@@ -208,6 +208,7 @@ function DatasetSelectionModal({ modelId, disease, onClose, onTrainingComplete }
             await client.post(`${API_URL}/rounds/submit`, {
                 roundId: activeRound.round_id,
                 modelWeights,
+                zkArtifact,
                 trainingMetrics: metrics
             });
 
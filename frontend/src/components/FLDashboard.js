@@ -479,6 +479,7 @@ function FLDashboard() {
                                         <option value="logistic_regression">Logistic Regression</option>
                                         <option value="neural_network">Neural Network</option>
                                         <option value="random_forest">Random Forest</option>
+                                        <option value="gradient_boosting">Gradient Boosting</option>
                                         <option value="cnn">CNN</option>
                                     </select>
                                 </div>
@@ -553,6 +553,7 @@ const FLManager = () => {
                                 <option value="logistic_regression">Logistic Regression</option>
                                 <option value="neural_network">Neural Network</option>
                                 <option value="random_forest">Random Forest</option>
+                                <option value="gradient_boosting">Gradient Boosting</option>
                                 <option value="cnn">CNN</option>
                             </select>
                             <Button type="submit" disabled={loading}>
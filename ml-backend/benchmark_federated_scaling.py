@@ -0,0 +1,110 @@
+"""
+Rounds-to-target-accuracy with per-site vs federated feature scaling.
+
+A dataset is split into non-IID hospital sites (rows sorted by one feature, so
+each site sees a different slice of its range). Every round each site runs a few
+epochs of logistic-regression gradient descent from the global weights, and the
+weights are averaged by sample count (FedAvg). Sites either standardise with
+their own statistics (the old load_dataset behaviour) or with the global
+statistics merged by scaler_stats.merge_stats. Accuracy is the global model's
+accuracy over all sites' held-out rows, each scaled the way that site scales.
+
+Run: python3 ml-backend/benchmark_federated_scaling.py [disease] [sites] [target]
+     e.g. python3 ml-backend/benchmark_federated_scaling.py cancer 5 0.95
+"""
+import os
+import sys
+
+# Ensure local modules are findable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from kaggle_loader import load_raw_dataset, get_train_test_split
+from scaler_stats import local_stats, merge_stats, build_scaler
+
+MAX_ROUNDS = 100
+LOCAL_EPOCHS = 5
+LEARNING_RATE = 0.1
+SKEW_FEATURE = 0
+
+
+def assign_sites(X, n_sites, skew_feature=SKEW_FEATURE):
+    """Non-IID partition: site k gets the k-th quantile slice of one feature's range."""
+    order = np.argsort(X[:, skew_feature], kind='stable')
+    site = np.empty(len(X), dtype=int)
+    for k, idx in enumerate(np.array_split(order, n_sites)):
+        site[idx] = k
+    return site
+
+
+def _local_update(w, b, X, y, epochs=LOCAL_EPOCHS, lr=LEARNING_RATE):
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X @ w + b)))
+        grad = p - y
+        w = w - lr * (X.T @ grad) / len(X)
+        b = b - lr * grad.mean()
+    return w, b
+
+
+def run_fedavg(sites, scaling, target, max_rounds=MAX_ROUNDS):
+    """Return (rounds to reach `target`, or None, and the accuracy curve)."""
+    if scaling == 'federated':
+        shared = build_scaler(merge_stats([local_stats(X_train) for X_train, _, _, _ in sites]))
+        scalers = [shared] * len(sites)
+    else:
+        scalers = [build_scaler(local_stats(X_train)) for X_train, _, _, _ in sites]
+
+    prepared = [
+        (scaler.transform(X_train), y_train, scaler.transform(X_test), y_test)
+        for scaler, (X_train, y_train, X_test, y_test) in zip(scalers, sites)
+    ]
+    n_features = sites[0][0].shape[1]
+    w, b = np.zeros(n_features), 0.0
+    counts = np.asarray([len(X_train) for X_train, _, _, _ in prepared], dtype=float)
+
+    curve = []
+    reached = None
+    for round_number in range(1, max_rounds + 1):
+        updates = [_local_update(w, b, X_train, y_train) for X_train, y_train, _, _ in prepared]
+        w = np.average([u[0] for u in updates], axis=0, weights=counts)
+        b = float(np.average([u[1] for u in updates], weights=counts))
+
+        correct = sum(int((((X_test @ w + b) > 0) == y_test).sum()) for _, _, X_test, y_test in prepared)
+        accuracy = correct / sum(len(y_test) for _, _, _, y_test in prepared)
+        curve.append(accuracy)
+        if reached is None and accuracy >= target:
+            reached = round_number
+    return reached, curve
+
+
+def benchmark(disease='cancer', n_sites=5, target=0.95):
+    datasets_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets/")
+    X, y = load_raw_dataset(disease, data_path=datasets_path)
+    X, y = X.to_numpy(dtype=float), np.asarray(y, dtype=float)
+
+    # Stratified split on the whole dataset, then every row goes to its site (some sites may be single-class)
+    site = assign_sites(X, n_sites)
+    X_train, X_test, y_train, y_test = get_train_test_split(np.column_stack([X, site]), y)
+    site_train, site_test = X_train[:, -1].astype(int), X_test[:, -1].astype(int)
+    X_train, X_test = X_train[:, :-1], X_test[:, :-1]
+    sites = [
+        (X_train[site_train == k], y_train[site_train == k], X_test[site_test == k], y_test[site_test == k])
+        for k in range(n_sites)
+    ]
+
+    results = {}
+    for scaling in ('local', 'federated'):
+        rounds, curve = run_fedavg(sites, scaling, target)
+        results[scaling] = {"roundsToTarget": rounds, "finalAccuracy": curve[-1], "bestAccuracy": max(curve)}
+        shown = rounds if rounds is not None else f">{MAX_ROUNDS}"
+        print(f"  {scaling:<10} rounds to {target:.2f}: {shown:>5}   final acc {curve[-1]:.4f}   best {max(curve):.4f}")
+    return results
+
+
+if __name__ == "__main__":
+    disease = sys.argv[1] if len(sys.argv) > 1 else 'cancer'
+    n_sites = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    target = float(sys.argv[3]) if len(sys.argv) > 3 else 0.95
+    print(f"⏱️ FedAvg on {n_sites} non-IID {disease} sites: per-site vs federated scaling...")
+    benchmark(disease, n_sites, target)
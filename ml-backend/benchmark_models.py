@@ -0,0 +1,71 @@
+"""
+Benchmark training time and accuracy of every model type on scaled-up datasets.
+
+The Kaggle datasets are small, so each one is upsampled to larger cohorts by
+resampling rows with a little Gaussian jitter (features are standardised first).
+The split into train/test happens before upsampling. Every model type is then
+trained with create_model() exactly as in production.
+
+Run: python3 ml-backend/benchmark_models.py [disease] [scale ...]
+     e.g. python3 ml-backend/benchmark_models.py diabetes 1 10 50
+"""
+import os
+import sys
+import time
+
+# Ensure local modules are findable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+from kaggle_loader import load_dataset, get_train_test_split
+from train_model import create_model
+
+MODEL_TYPES = ['logistic_regression', 'random_forest', 'neural_network', 'cnn', 'gradient_boosting']
+DEFAULT_SCALES = [1, 10, 50]
+JITTER = 0.05
+
+
+def scale_dataset(X, y, factor, seed=42):
+    """Upsample (X, y) by `factor` with jittered copies of existing rows."""
+    if factor <= 1:
+        return X, y
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(X), size=len(X) * factor)
+    X_big = X[indices] + rng.normal(0, JITTER, size=(len(indices), X.shape[1]))
+    return X_big, y[indices]
+
+
+def benchmark(disease='diabetes', scales=DEFAULT_SCALES, model_types=MODEL_TYPES):
+    datasets_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets/")
+    X, y = load_dataset(disease, data_path=datasets_path)
+    # Split before upsampling so jittered copies of a test row never end up in training
+    X_train_base, X_test_base, y_train_base, y_test_base = get_train_test_split(X, np.asarray(y))
+
+    results = []
+    for factor in scales:
+        X_train, y_train = scale_dataset(X_train_base, y_train_base, factor)
+        X_test, y_test = scale_dataset(X_test_base, y_test_base, factor, seed=7)
+        for model_type in model_types:
+            model = create_model(model_type, {})
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_time = time.perf_counter() - start
+            results.append({
+                "disease": disease,
+                "scale": factor,
+                "rows": len(X_train) + len(X_test),
+                "modelType": model_type,
+                "fitTime": fit_time,
+                "accuracy": float(accuracy_score(y_test, model.predict(X_test)))
+            })
+            print(f"  {model_type:<20} {results[-1]['rows']:>9,} rows  fit {fit_time:>8.2f}s  acc {results[-1]['accuracy']:.4f}")
+    return results
+
+
+if __name__ == "__main__":
+    disease = sys.argv[1] if len(sys.argv) > 1 else 'diabetes'
+    scales = [int(s) for s in sys.argv[2:]] or DEFAULT_SCALES
+    print(f"⏱️ Benchmarking model types on scaled {disease} datasets (x{', x'.join(map(str, scales))})...")
+    benchmark(disease, scales)
@@ -0,0 +1,345 @@
+"""
+Bulk ingestion of diagnostic metrics exported straight from PostgreSQL.
+
+Instead of having Node build feature vectors row by row and serialize the whole
+cohort into the `customData` JSON payload, the ML backend can read a COPY export
+(or any local file dump with the same layout) of the diagnostic_metrics table:
+
+    COPY (SELECT record_id, metric_name, metric_value
+          FROM diagnostic_metrics WHERE disease_category = 'diabetes'
+          ORDER BY record_id, metric_name)
+    TO '/tmp/diabetes_metrics.csv' WITH (FORMAT csv, HEADER);
+
+Supported formats: COPY csv (with or without HEADER), COPY text (tab separated)
+and COPY binary. For binary exports metric_value must be cast to float8
+(`metric_value::float8`) since DECIMAL is sent in PostgreSQL's packed numeric form.
+
+Rows are parsed in chunks and pivoted into feature columns with the same rules
+as services/medicalRecordFeatureExtractor.js, so both paths produce identical
+feature matrices.
+"""
+import math
+import struct
+
+import numpy as np
+import pandas as pd
+
+# Must stay in sync with DISEASE_FEATURE_MAPS in services/medicalRecordFeatureExtractor.js
+# (column order matches kaggle_loader.py). Mapping order matters: when two metric names
+# map to the same column, the first one listed wins.
+DISEASE_FEATURE_MAPS = {
+    'diabetes': {
+        'columns': ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'],
+        'metricMapping': {
+            'Pregnancies': 'Pregnancies',
+            'Glucose': 'Glucose',
+            'Blood Pressure': 'BloodPressure',
+            'Blood Pressure Systolic': 'BloodPressure',
+            'Skin Thickness': 'SkinThickness',
+            'Insulin': 'Insulin',
+            'BMI': 'BMI',
+            'Diabetes Pedigree Function': 'DiabetesPedigreeFunction',
+            'HbA1c': None,
+            'Age': 'Age'
+        }
+    },
+    'cvd': {
+        'columns': ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak'],
+        'metricMapping': {
+            'Age': 'age',
+            'Sex': 'sex',
+            'Chest Pain Type': 'cp',
+            'Resting Blood Pressure': 'trestbps',
+            'Cholesterol': 'chol',
+            'Fasting Blood Sugar': 'fbs',
+            'Resting ECG': 'restecg',
+            'Max Heart Rate': 'thalach',
+            'Exercise Angina': 'exang',
+            'ST Depression': 'oldpeak'
+        }
+    },
+    'cancer': {
+        'columns': ['radius_mean', 'texture_mean', 'perimeter_mean', 'area_mean', 'smoothness_mean', 'compactness_mean', 'concavity_mean', 'symmetry_mean', 'fractal_dimension_mean'],
+        'metricMapping': {
+            'Radius Mean': 'radius_mean',
+            'Texture Mean': 'texture_mean',
+            'Perimeter Mean': 'perimeter_mean',
+            'Area Mean': 'area_mean',
+            'Smoothness Mean': 'smoothness_mean',
+            'Compactness Mean': 'compactness_mean',
+            'Concavity Mean': 'concavity_mean',
+            'Symmetry Mean': 'symmetry_mean',
+            'Fractal Dimension Mean': 'fractal_dimension_mean'
+        }
+    },
+    'pneumonia': {
+        'columns': ['FEV1', 'FVC', 'SpO2', 'respiratory_rate', 'temperature', 'age'],
+        'metricMapping': {
+            'FEV1': 'FEV1',
+            'FVC': 'FVC',
+            'SpO2': 'SpO2',
+            'Respiratory Rate': 'respiratory_rate',
+            'Temperature': 'temperature',
+            'Age': 'age'
+        }
+    }
+}
+
+EXPORT_COLUMNS = ['record_id', 'metric_name', 'metric_value']
+MIN_FEATURE_RATIO = 0.5  # Same threshold as the JS extractor
+DEFAULT_CHUNK_ROWS = 100000
+BINARY_BLOCK_BYTES = 4 * 1024 * 1024
+
+PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+
+def detect_format(path):
+    """Guess the COPY format of an export file from its first bytes."""
+    with open(path, 'rb') as f:
+        head = f.read(len(PGCOPY_SIGNATURE))
+        if head == PGCOPY_SIGNATURE:
+            return 'binary'
+        first_line = head + f.readline()
+    return 'text' if b'\t' in first_line else 'csv'
+
+
+def _has_header(path, sep):
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+    return first.split(sep)[0].strip().strip('"') == 'record_id'
+
+
+def _read_delimited_chunks(path, fmt, chunk_rows):
+    sep = '\t' if fmt == 'text' else ','
+    reader = pd.read_csv(
+        path,
+        sep=sep,
+        header=0 if _has_header(path, sep) else None,
+        names=EXPORT_COLUMNS,
+        usecols=[0, 1, 2],
+        dtype={'record_id': str, 'metric_name': str},
+        na_values=['\\N'] if fmt == 'text' else None,
+        chunksize=chunk_rows
+    )
+    for chunk in reader:
+        chunk['metric_value'] = pd.to_numeric(chunk['metric_value'], errors='coerce')
+        yield chunk
+
+
+def _decode_binary_values(data, offsets, lengths):
+    """Vectorized float8/float4 decode of the metric_value field of many tuples."""
+    values = np.full(len(offsets), np.nan)
+    if not len(offsets):
+        return values
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if np.any((lengths != -1) & (lengths != 8) & (lengths != 4)):
+        raise ValueError("metric_value must be exported as float8/float4 (cast with metric_value::float8)")
+    for width, dtype in ((8, '>f8'), (4, '>f4')):
+        mask = lengths == width
+        if mask.any():
+            gathered = raw[offsets[mask][:, None] + np.arange(width)]
+            values[mask] = gathered.view(dtype).ravel()
+    return values
+
+
+def _scan_binary_tuples(data, pos):
+    """
+    Walk the complete tuples in `data` from `pos`, decoding record_id/metric_name and
+    noting where each metric_value sits. Returns (record_ids, metric_names,
+    value_offsets, value_lengths, position after the last complete tuple,
+    whether the trailer was reached).
+    """
+    unpack_head = struct.Struct('>hi').unpack_from  # field count + first field length
+    unpack_i32 = struct.Struct('>i').unpack_from
+    end = len(data)
+    record_ids, metric_names, value_offsets, value_lengths = [], [], [], []
+    texts = {}  # record ids and metric names repeat constantly; decode each once
+
+    while pos + 2 <= end:
+        if pos + 6 > end:
+            if struct.unpack_from('>h', data, pos)[0] == -1:
+                return record_ids, metric_names, value_offsets, value_lengths, pos + 2, True
+            break
+        n_fields, length = unpack_head(data, pos)
+        if n_fields == -1:  # file trailer
+            return record_ids, metric_names, value_offsets, value_lengths, pos + 2, True
+        if n_fields < 3:
+            raise ValueError(f"Expected at least 3 columns per tuple, got {n_fields}")
+
+        cursor = pos + 6
+        spans = []
+        for field in range(n_fields):
+            if field:
+                if cursor + 4 > end:
+                    break
+                length, = unpack_i32(data, cursor)
+                cursor += 4
+            spans.append((cursor, length))
+            if length > 0:
+                cursor += length
+        if len(spans) < n_fields or cursor > end:
+            break
+
+        for (offset, length), out in zip(spans[:2], (record_ids, metric_names)):
+            if length == -1:
+                out.append(None)
+                continue
+            raw = data[offset:offset + length]
+            text = texts.get(raw)
+            if text is None:
+                text = texts[raw] = raw.decode('utf-8')
+            out.append(text)
+        value_offsets.append(spans[2][0])
+        value_lengths.append(spans[2][1])
+        pos = cursor
+
+    return record_ids, metric_names, value_offsets, value_lengths, pos, False
+
+
+def _read_binary_chunks(path, chunk_rows, block_bytes=None):
+    """
+    Stream a PostgreSQL COPY BINARY file in fixed-size blocks. Complete tuples of
+    each block are located from their length headers, then decoded a block at a
+    time (metric values in one vectorized gather); a tuple cut by the block edge is
+    carried into the next block.
+    """
+    block_bytes = block_bytes or BINARY_BLOCK_BYTES
+    pending = b''
+    header_done = False
+    frames, n_rows = [], 0
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_bytes)
+            data = pending + block
+            pos = 0
+            if not header_done:
+                header_len = len(PGCOPY_SIGNATURE) + 8
+                if len(data) < header_len and block:
+                    pending = data
+                    continue
+                if data[:len(PGCOPY_SIGNATURE)] != PGCOPY_SIGNATURE:
+                    raise ValueError("Not a PostgreSQL COPY BINARY file (bad signature)")
+                ext_len, = struct.unpack_from('>i', data, len(PGCOPY_SIGNATURE) + 4)
+                if len(data) < header_len + ext_len and block:
+                    pending = data
+                    continue
+                pos = header_len + ext_len
+                header_done = True
+
+            record_ids, metric_names, offsets, lengths, pos, finished = _scan_binary_tuples(data, pos)
+            if record_ids:
+                frames.append(pd.DataFrame({
+                    'record_id': record_ids,
+                    'metric_name': metric_names,
+                    'metric_value': _decode_binary_values(
+                        data, np.asarray(offsets, dtype=np.int64), np.asarray(lengths, dtype=np.int64))
+                }))
+                n_rows += len(record_ids)
+            if n_rows >= chunk_rows or (finished and frames):
+                yield pd.concat(frames, ignore_index=True)
+                frames, n_rows = [], 0
+            if finished:
+                return
+            pending = data[pos:]
+            if not block:
+                raise ValueError("Truncated COPY BINARY file (missing trailer)")
+
+
+def iter_metric_chunks(path, fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield DataFrames of (record_id, metric_name, metric_value) rows from an export.
+    Chunks are re-cut on record boundaries so a record never spans two chunks,
+    which requires the export to be ordered by record_id (as the COPY query above is).
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == 'binary':
+        raw_chunks = _read_binary_chunks(path, chunk_rows)
+    elif fmt in ('csv', 'text'):
+        raw_chunks = _read_delimited_chunks(path, fmt, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    carry = None
+    for chunk in raw_chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        last_id = chunk['record_id'].iat[-1]
+        tail = (chunk['record_id'] == last_id).to_numpy()
+        carry = chunk[tail]
+        complete = chunk[~tail]
+        if not complete.empty:
+            yield complete
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def pivot_metrics(chunk, disease):
+    """
+    Pivot long-format metric rows into (X, y) for one chunk of complete records.
+
+    Mirrors extractFeaturesForDisease: the first diagnosis/target metric (by name)
+    gives the label, each column takes the first mapped metric present, records
+    need at least half the columns filled, and missing values default to 0.
+    """
+    feature_map = DISEASE_FEATURE_MAPS.get(disease)
+    if not feature_map:
+        raise ValueError(f"No feature map defined for disease: {disease}")
+    columns = feature_map['columns']
+    n_cols = len(columns)
+
+    df = chunk.dropna(subset=['record_id', 'metric_name', 'metric_value'])
+    # Later duplicates of the same metric overwrite earlier ones (as in the JS object build)
+    df = df.drop_duplicates(subset=['record_id', 'metric_name'], keep='last')
+
+    names_lower = df['metric_name'].str.lower()
+    is_label = names_lower.str.contains('diagnosis', regex=False) | (names_lower == 'target')
+    labels = (df[is_label]
+              .sort_values(['record_id', 'metric_name'], kind='stable')
+              .drop_duplicates(subset='record_id', keep='first')
+              .set_index('record_id')['metric_value'])
+    labels = (labels > 0).astype(np.int64)
+
+    priority = {name: i for i, name in enumerate(feature_map['metricMapping'])}
+    column_of = {name: col for name, col in feature_map['metricMapping'].items() if col}
+    features = df[df['metric_name'].isin(column_of.keys())].copy()
+    features['column'] = features['metric_name'].map(column_of)
+    features['priority'] = features['metric_name'].map(priority)
+    features = (features
+                .sort_values(['record_id', 'column', 'priority'], kind='stable')
+                .drop_duplicates(subset=['record_id', 'column'], keep='first'))
+
+    wide = features.pivot(index='record_id', columns='column', values='metric_value')
+    wide = wide.reindex(index=labels.index, columns=columns)
+
+    required = math.ceil(n_cols * MIN_FEATURE_RATIO)
+    keep = (wide.notna().sum(axis=1) >= required).to_numpy()
+
+    X = wide.to_numpy(dtype=np.float64, na_value=0.0)[keep]
+    y = labels.to_numpy()[keep]
+    return X, y
+
+
+def iter_feature_chunks(path, disease, fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream (X_chunk, y_chunk) feature blocks from a bulk export."""
+    for chunk in iter_metric_chunks(path, fmt=fmt, chunk_rows=chunk_rows):
+        X, y = pivot_metrics(chunk, disease)
+        if len(X) > 0:
+            yield X, y
+
+
+def load_bulk_export(path, disease, fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Load a whole bulk export into feature/label arrays ready for training.
+    Returns (X, y); both are empty when no record qualifies.
+    """
+    X_parts, y_parts = [], []
+    for X, y in iter_feature_chunks(path, disease, fmt=fmt, chunk_rows=chunk_rows):
+        X_parts.append(X)
+        y_parts.append(y)
+
+    n_cols = len(DISEASE_FEATURE_MAPS[disease]['columns'])
+    if not X_parts:
+        return np.empty((0, n_cols)), np.empty((0,), dtype=np.int64)
+    return np.vstack(X_parts), np.concatenate(y_parts)
@@ -9,6 +9,8 @@ sys.path.append(os.path.dirname(__file__))
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, roc_auc_score
 from kaggle_loader import load_dataset, get_train_test_split
+from profiling import profile_request
+from scaler_stats import resolve_scaler_stats
 
 def evaluate(input_data):
     # In production, we'd receive weights and the target disease
@@ -22,7 +24,7 @@ def evaluate(input_data):
     
     try:
         # Load the test data for this disease
-        X, y = load_dataset(disease, data_path=datasets_path)
+        X, y = load_dataset(disease, data_path=datasets_path, scaler_stats=resolve_scaler_stats(input_data, disease))
         _, X_test, _, y_test = get_train_test_split(X, y)
         
         # Initialize a new model and inject the weights
@@ -62,12 +64,21 @@ def evaluate(input_data):
         return {"error": f"Evaluation error: {str(e)}"}
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        try:
+    # Node sends the payload via stdin; argv is kept for manual CLI testing
+    try:
+        if not sys.stdin.isatty():
+            input_raw = sys.stdin.read().strip()
+            input_data = json.loads(input_raw) if input_raw else None
+        elif len(sys.argv) > 1:
             input_data = json.loads(sys.argv[1])
-            result = evaluate(input_data)
-            print(json.dumps(result))
-        except json.JSONDecodeError:
-            print(json.dumps({"error": "Invalid JSON input"}))
-    else:
-        print(json.dumps({"error": "No input data provided"}))
+        else:
+            input_data = None
+
+        if input_data is None:
+            print(json.dumps({"error": "No input data provided"}))
+        else:
+            with profile_request("evaluate", input_data):
+                output = json.dumps(evaluate(input_data))
+            print(output)
+    except json.JSONDecodeError:
+        print(json.dumps({"error": "Invalid JSON input"}))
@@ -0,0 +1,287 @@
+"""
+Histogram-based gradient boosting for large tabular cohorts (modelType "gradient_boosting").
+
+Features are binned into at most 255 buckets, trees are grown on the histograms
+with sklearn's OpenMP code (so training uses every thread the scheduler allows),
+and early stopping ends a round once the validation loss stops improving.
+
+Fitted models are shipped as a compact form instead of nested lists: every tree's
+node records are packed into one little-endian byte buffer, zlib-compressed and
+base64-encoded, next to the baseline prediction and per-tree node counts. The same
+form restores a model for warm start, so each round adds trees on top of the
+previous global ensemble.
+
+Site ensembles are aggregated by merging, not averaging: the trees every site
+restored from the previous global model are kept once, and each site's new trees
+are appended with their leaf values scaled by the site's sample weight. The merged
+model's raw score is then exactly the weighted average of the sites' raw scores.
+Run as a script it reads {"action": "merge", "payloads": [...], "weights": [...]}
+from stdin and prints the merged payload.
+"""
+import base64
+import json
+import sys
+import zlib
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.ensemble._hist_gradient_boosting.common import PREDICTOR_RECORD_DTYPE
+from sklearn.ensemble._hist_gradient_boosting.predictor import TreePredictor
+
+FORMAT_VERSION = 1
+
+# Portable subset of PREDICTOR_RECORD_DTYPE (which uses platform-sized intp).
+# Categorical splits and split gains are not needed to predict or to keep boosting.
+PACKED_NODE_DTYPE = np.dtype([
+    ('value', '<f8'),
+    ('count', '<u4'),
+    ('feature_idx', '<i4'),
+    ('num_threshold', '<f8'),
+    ('missing_go_to_left', 'u1'),
+    ('left', '<u4'),
+    ('right', '<u4'),
+    ('depth', '<u4'),
+    ('is_leaf', 'u1'),
+    ('bin_threshold', 'u1')
+])
+
+_EMPTY_BITSETS = np.zeros((0, 8), dtype=np.uint32)
+
+
+class FederatedHistGradientBoostingClassifier(HistGradientBoostingClassifier):
+    """
+    HistGradientBoostingClassifier that can keep boosting from trees trained elsewhere.
+
+    sklearn's warm start re-fits the bin mapper on the new data and then scores the
+    existing trees on *binned* data, so trees restored from another site would be
+    compared against bin indices they were never grown on. After the bin mapper is
+    fitted we re-derive each restored split's bin threshold from its raw threshold.
+
+    This hooks sklearn internals (_bin_data, _predictors, _baseline_prediction,
+    TreePredictor); requirements.txt pins the releases it is tested against.
+    """
+
+    def _bin_data(self, *args, **kwargs):
+        # (X, is_training_data) before sklearn 1.9, (X, sample_weight, is_training_data) since
+        X_binned = super()._bin_data(*args, **kwargs)
+        is_training_data = kwargs.get('is_training_data', args[-1] if len(args) > 1 else False)
+        if is_training_data and getattr(self, '_remap_bin_thresholds', False):
+            _remap_bin_thresholds(self._predictors, self._bin_mapper.bin_thresholds_)
+            self._remap_bin_thresholds = False
+        return X_binned
+
+
+def _remap_bin_thresholds(predictors, bin_thresholds):
+    for predictors_of_iteration in predictors:
+        for predictor in predictors_of_iteration:
+            nodes = predictor.nodes
+            split = np.flatnonzero(nodes['is_leaf'] == 0)
+            for i in split:
+                thresholds = bin_thresholds[nodes['feature_idx'][i]]
+                nodes['bin_threshold'][i] = min(
+                    np.searchsorted(thresholds, nodes['num_threshold'][i], side='left'),
+                    len(thresholds)
+                )
+
+
+def create_hist_gradient_boosting(config):
+    return FederatedHistGradientBoostingClassifier(
+        max_iter=config.get("n_estimators", 100),
+        learning_rate=config.get("learning_rate", 0.1),
+        max_leaf_nodes=config.get("max_leaf_nodes", 31),
+        max_depth=config.get("max_depth"),
+        max_bins=config.get("max_bins", 255),
+        l2_regularization=config.get("l2_regularization", 0.0),
+        early_stopping=config.get("early_stopping", True),
+        validation_fraction=config.get("validation_fraction", 0.1),
+        n_iter_no_change=config.get("n_iter_no_change", 10),
+        scoring='loss',
+        random_state=42
+    )
+
+
+def hist_boosting_tensors(model):
+    """Numeric view of the ensemble used for ZK commitments: baseline, leaf values and split thresholds."""
+    nodes = [predictor.nodes for predictors in model._predictors for predictor in predictors]
+    all_nodes = np.concatenate(nodes) if nodes else np.zeros(0, dtype=PREDICTOR_RECORD_DTYPE)
+    return {
+        "baseline": np.asarray(model._baseline_prediction, dtype=np.float64).ravel(),
+        "node_values": all_nodes['value'].astype(np.float64),
+        "node_thresholds": all_nodes['num_threshold'].astype(np.float64)
+    }
+
+
+def payload_tensors(payload):
+    """hist_boosting_tensors computed from a serialized payload instead of a fitted model."""
+    nodes = [predictor.nodes for predictors in _deserialize_predictors(payload) for predictor in predictors]
+    all_nodes = np.concatenate(nodes) if nodes else np.zeros(0, dtype=PREDICTOR_RECORD_DTYPE)
+    return {
+        "baseline": np.asarray(payload["baseline"], dtype=np.float64).ravel(),
+        "node_values": all_nodes['value'].astype(np.float64),
+        "node_thresholds": all_nodes['num_threshold'].astype(np.float64)
+    }
+
+
+def serialize_hist_gradient_boosting(model):
+    """Compact serialized form of a fitted model (see module docstring)."""
+    if any(p.nodes['is_categorical'].any() for ps in model._predictors for p in ps):
+        raise ValueError("Categorical splits are not supported by the compact model format")
+
+    node_arrays = [predictor.nodes for predictors in model._predictors for predictor in predictors]
+    packed = np.zeros(sum(len(n) for n in node_arrays), dtype=PACKED_NODE_DTYPE)
+    offset = 0
+    for nodes in node_arrays:
+        chunk = packed[offset:offset + len(nodes)]
+        for field in PACKED_NODE_DTYPE.names:
+            chunk[field] = nodes[field]
+        offset += len(nodes)
+
+    return {
+        "format": "hist_gradient_boosting",
+        "version": FORMAT_VERSION,
+        "n_iter": int(model.n_iter_),
+        "n_trees_per_iteration": int(model.n_trees_per_iteration_),
+        "n_features": int(model.n_features_in_),
+        "learning_rate": float(model.learning_rate),
+        "classes": model.classes_.tolist(),
+        "baseline": np.asarray(model._baseline_prediction, dtype=np.float64).ravel().tolist(),
+        "tree_sizes": [len(n) for n in node_arrays],
+        "trees": base64.b64encode(zlib.compress(packed.tobytes(), 6)).decode('ascii')
+    }
+
+
+def _packed_trees(payload):
+    """Per-tree PACKED_NODE_DTYPE arrays, in iteration order."""
+    raw = zlib.decompress(base64.b64decode(payload["trees"]))
+    packed = np.frombuffer(raw, dtype=PACKED_NODE_DTYPE)
+    k = int(payload["n_trees_per_iteration"])
+    sizes = np.asarray(payload["tree_sizes"], dtype=np.int64)
+    if sizes.sum() != len(packed) or len(sizes) != int(payload["n_iter"]) * k:
+        raise ValueError("Corrupt gradient boosting payload (tree sizes do not match node buffer)")
+    return np.split(packed, np.cumsum(sizes)[:-1]) if len(sizes) else []
+
+
+def _deserialize_predictors(payload):
+    trees = _packed_trees(payload)
+    k = int(payload["n_trees_per_iteration"])
+    predictors = []
+    for i in range(0, len(trees), k):
+        iteration = []
+        for source in trees[i:i + k]:
+            nodes = np.zeros(len(source), dtype=PREDICTOR_RECORD_DTYPE)
+            for field in PACKED_NODE_DTYPE.names:
+                nodes[field] = source[field]
+            iteration.append(TreePredictor(nodes, _EMPTY_BITSETS, _EMPTY_BITSETS))
+        predictors.append(iteration)
+    return predictors
+
+
+def _same_tree(a, b):
+    # bin_threshold is re-derived from each site's bin mapper on restore, so it may differ
+    if len(a) != len(b):
+        return False
+    return all(np.array_equal(a[field], b[field]) for field in PACKED_NODE_DTYPE.names if field != 'bin_threshold')
+
+
+def merge_hist_gradient_boosting(payloads, weights):
+    """
+    Merge site ensembles into one global ensemble (see module docstring).
+    `weights` are the sites' sample counts or fractions.
+    """
+    if not payloads:
+        raise ValueError("No gradient boosting payloads to merge")
+    first = payloads[0]
+    for payload in payloads:
+        if payload.get("format") != "hist_gradient_boosting" or int(payload.get("version", -1)) != FORMAT_VERSION:
+            raise ValueError("Unsupported gradient boosting payload format")
+        for key in ("n_features", "n_trees_per_iteration", "classes"):
+            if payload[key] != first[key]:
+                raise ValueError(f"Cannot merge gradient boosting models with different {key}")
+
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(weights) != len(payloads) or weights.sum() <= 0:
+        raise ValueError("Merge weights must give one positive weight per payload")
+    weights = weights / weights.sum()
+
+    k = int(first["n_trees_per_iteration"])
+    site_trees = [_packed_trees(payload) for payload in payloads]
+
+    # Iterations every site restored from the previous global model
+    shared = min(len(trees) for trees in site_trees) // k
+    for i in range(shared):
+        if not all(_same_tree(trees[i * k + j], site_trees[0][i * k + j]) for trees in site_trees for j in range(k)):
+            shared = i
+            break
+
+    merged = list(site_trees[0][:shared * k])
+    for trees, weight in zip(site_trees, weights):
+        for tree in trees[shared * k:]:
+            scaled = tree.copy()
+            scaled['value'] *= weight
+            merged.append(scaled)
+
+    baseline = np.average(np.asarray([p["baseline"] for p in payloads], dtype=np.float64), axis=0, weights=weights)
+    packed = np.concatenate(merged) if merged else np.zeros(0, dtype=PACKED_NODE_DTYPE)
+    return {
+        "format": "hist_gradient_boosting",
+        "version": FORMAT_VERSION,
+        "n_iter": len(merged) // k,
+        "n_trees_per_iteration": k,
+        "n_features": int(first["n_features"]),
+        "learning_rate": float(first["learning_rate"]),
+        "classes": first["classes"],
+        "baseline": np.atleast_1d(baseline).tolist(),
+        "tree_sizes": [len(tree) for tree in merged],
+        "trees": base64.b64encode(zlib.compress(packed.tobytes(), 6)).decode('ascii')
+    }
+
+
+def restore_hist_gradient_boosting(model, payload, n_features, rounds_to_add=None, classes=None):
+    """
+    Load a serialized ensemble into a fresh model so the next `fit` keeps boosting.
+    Each round adds up to `rounds_to_add` iterations (default: the model's max_iter).
+    Returns False if the payload doesn't fit the current feature space or, when the
+    site's `classes` are given, its labels (trees are per class for multiclass).
+    """
+    if int(payload.get("n_features", -1)) != n_features:
+        return False
+    if classes is not None:
+        classes = np.unique(classes)
+        expected_trees = 1 if len(classes) <= 2 else len(classes)
+        if int(payload.get("n_trees_per_iteration", -1)) != expected_trees:
+            return False
+        if not np.array_equal(np.asarray(payload.get("classes", [])), classes):
+            return False
+
+    predictors = _deserialize_predictors(payload)
+    rounds_to_add = rounds_to_add or model.max_iter
+    rng = np.random.RandomState(model.random_state)
+
+    model.set_params(warm_start=True, max_iter=len(predictors) + rounds_to_add)
+    model._predictors = predictors
+    model._baseline_prediction = np.asarray(payload["baseline"], dtype=np.float64).reshape(1, -1)
+    model._random_seed = rng.randint(np.iinfo(np.uint32).max, dtype="u8")
+    model._feature_subsample_rng = np.random.default_rng(rng.randint(np.iinfo(np.uint32).max, dtype="u8"))
+    model.train_score_ = np.asarray([])
+    model.validation_score_ = np.asarray([])
+    model._remap_bin_thresholds = True
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        input_raw = sys.stdin.read().strip()
+        if not input_raw:
+            print(json.dumps({"error": "No input data provided via stdin"}))
+        else:
+            request = json.loads(input_raw)
+            if request.get("action") != "merge":
+                print(json.dumps({"error": f"Unknown gradient boosting action: {request.get('action')}"}))
+            else:
+                print(json.dumps(merge_hist_gradient_boosting(request.get("payloads") or [], request.get("weights") or [])))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
+    except (KeyError, ValueError) as e:
+        print(json.dumps({"error": str(e)}))
+    except Exception as e:
+        print(json.dumps({"error": f"Execution error: {str(e)}"}))
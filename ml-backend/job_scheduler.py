@@ -0,0 +1,551 @@
+"""
+Resource-aware scheduler for concurrent training jobs.
+
+When several institutions trigger training at the same time, each job used to get
+its own Python process with numpy/OpenBLAS and sklearn free to grab every core.
+The scheduler runs jobs through a bounded worker pool instead:
+
+- jobs wait in a priority queue (lower number = runs first, FIFO within a priority)
+- admission control holds a job back until its estimated memory fits the budget
+- each job runs train_model.py / evaluate_model.py in a subprocess with BLAS/OpenMP
+  thread limits and `n_jobs` set when it is dispatched: the cores not used by running
+  jobs are shared among the jobs starting now, so a job alone on an idle host gets them all
+- queued jobs can be cancelled; running jobs are terminated
+- queue depth, wait times and memory in use are exposed via `metrics()`
+
+The Node bridge runs it as one long-lived service (`job_scheduler.py --serve`) so
+training and evaluation requests from every institution share the same queue. It
+reads one JSON command per stdin line and writes one JSON event per stdout line:
+
+    {"action": "submit", "requestId": ..., "script": ..., "payload": {...}, "priority": 0}
+        -> {"event": "done", "requestId": ..., "jobId": ..., "status": ..., "result": {...}}
+    {"action": "cancel", "requestId": ..., "target": <submit requestId>}
+        -> {"event": "cancelled", "requestId": ..., "cancelled": bool}
+    {"action": "metrics", "requestId": ...}   -> {"event": "metrics", "requestId": ..., "metrics": {...}}
+
+Without --serve it reads {"jobs": [...], "maxWorkers": N, "memoryBudgetMb": M} from
+stdin, runs every job and prints the results plus scheduler metrics as JSON.
+"""
+import heapq
+import itertools
+from collections import Counter, deque
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ML_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Environment variables honoured by the BLAS/OpenMP runtimes numpy and sklearn link against
+THREAD_LIMIT_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+)
+
+DATASET_FILES = {
+    'diabetes': 'diabetes.csv',
+    'cvd': 'heart_disease_data.csv',
+    'cancer': 'breast_cancer.csv',
+    'pneumonia': 'pneumonia.csv'
+}
+
+# Record-derived feature columns per disease (bulk_loader.DISEASE_FEATURE_MAPS; not imported
+# so the long-lived scheduler doesn't load pandas)
+RECORD_FEATURES = {'diabetes': 8, 'cvd': 10, 'cancer': 9, 'pneumonia': 6}
+
+# Lower bounds on the size of one exported (record_id, metric_name, metric_value) row, so
+# row counts derived from file size err high: "1,BMI,1.0000\n" is 13 bytes; a binary tuple
+# adds a field count, three lengths and an 8-byte float8
+BULK_EXPORT_ROW_BYTES = {'csv': 16, 'text': 16, 'binary': 28}
+BULK_EXPORT_CHUNK_ROWS = 100000  # bulk_loader.DEFAULT_CHUNK_ROWS
+LONG_ROW_BYTES = 160             # one parsed long-format row in pandas (two str objects + float)
+
+PROCESS_BASE_MB = 180        # Interpreter + numpy/pandas/sklearn imports
+DATA_COPIES = 6              # DataFrame, scaled array, train/test split, model-internal copies
+DEFAULT_N_FEATURES = 30
+MLP_BATCH_SIZE = 200         # sklearn's default `batch_size='auto'` upper bound
+DEFAULT_JOB_TIMEOUT = 300    # seconds of run time, same limit as the direct Node bridge
+MAX_FINISHED_JOBS = 1000     # finished jobs kept for status() in a long-lived scheduler
+WAIT_TIME_SAMPLES = 1000     # most recent queue waits behind the waitTime metrics
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+
+
+def available_cores():
+    """Number of cores this process may run on (respects CPU affinity masks)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def default_memory_budget_mb():
+    """Three quarters of physical memory, or 4 GB when it can't be determined."""
+    try:
+        total = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        return int(total * 0.75 / (1024 * 1024))
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+_dataset_rows_cache = {}
+
+
+def _dataset_shape(disease):
+    """Approximate (rows, columns) of a bundled Kaggle dataset without parsing it."""
+    if disease in _dataset_rows_cache:
+        return _dataset_rows_cache[disease]
+    shape = (1000, DEFAULT_N_FEATURES)
+    filename = DATASET_FILES.get(disease)
+    if filename:
+        path = os.path.join(ML_BACKEND_DIR, 'datasets', filename)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                header = f.readline()
+                rows = sum(1 for _ in f)
+            shape = (rows, max(1, header.count(b',')))
+    _dataset_rows_cache[disease] = shape
+    return shape
+
+
+def _bulk_export_shape(bulk_export, disease):
+    """
+    Approximate (records, columns, parse bytes) of a diagnostic_metrics export from its
+    file size: one exported row per metric, one metric per feature plus the diagnosis.
+    """
+    n_features = RECORD_FEATURES.get(disease, DEFAULT_N_FEATURES)
+    try:
+        size = os.path.getsize(bulk_export.get('path'))
+    except (OSError, TypeError):
+        return _dataset_shape(disease) + (0,)
+    row_bytes = BULK_EXPORT_ROW_BYTES.get(bulk_export.get('format'), min(BULK_EXPORT_ROW_BYTES.values()))
+    metric_rows = size // row_bytes
+    chunk_rows = min(metric_rows, int(bulk_export.get('chunkRows') or BULK_EXPORT_CHUNK_ROWS))
+    return max(1, metric_rows // (n_features + 1)), n_features, chunk_rows * LONG_ROW_BYTES
+
+
+def estimate_job_memory_mb(payload):
+    """
+    Rough peak-memory estimate for a training payload, derived from dataset size
+    and model type. Deliberately conservative — it is only used for admission control.
+    """
+    custom_data = payload.get('customData') or {}
+    features = custom_data.get('features') or []
+    parse_bytes = 0
+    if features:
+        rows, n_features = len(features), len(features[0])
+    elif payload.get('dataSource') == 'bulk_export' and payload.get('bulkExport'):
+        rows, n_features, parse_bytes = _bulk_export_shape(payload['bulkExport'], payload.get('disease'))
+    else:
+        rows, n_features = _dataset_shape(payload.get('disease'))
+    if payload.get('sampleCount'):
+        rows = min(rows, int(payload['sampleCount']))
+
+    config = payload.get('config') or {}
+    model_type = payload.get('modelType', 'logistic_regression')
+
+    data_bytes = rows * n_features * 8 * DATA_COPIES + parse_bytes
+
+    if model_type == 'random_forest':
+        n_estimators = config.get('n_estimators', 100)
+        max_depth = config.get('max_depth', 10)
+        nodes_per_tree = min(2 * rows, 2 ** (max_depth + 1))
+        model_bytes = n_estimators * nodes_per_tree * 80  # sklearn Tree node record + value array
+    elif model_type == 'gradient_boosting':
+        # uint8 binned copy of X plus gradient/hessian buffers; trees themselves are small
+        n_iter = config.get('n_estimators', 100)
+        model_bytes = rows * n_features + rows * 8 * 4 + n_iter * config.get('max_leaf_nodes', 31) * 2 * 64
+    elif model_type in ('neural_network', 'cnn'):
+        default_layers = (128, 64, 32) if model_type == 'cnn' else (64, 32)
+        layers = [n_features] + list(config.get('hidden_layers', default_layers)) + [1]
+        n_params = sum(a * b + b for a, b in zip(layers[:-1], layers[1:]))
+        # weights + gradients + two Adam moment buffers, plus per-batch activations/deltas
+        model_bytes = n_params * 8 * 4 + MLP_BATCH_SIZE * sum(layers) * 8 * 3
+    else:
+        model_bytes = n_features * 8 * 10
+
+    return int(PROCESS_BASE_MB + (data_bytes + model_bytes) / (1024 * 1024)) + 1
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TrainingJob:
+    """A single queued training/evaluation request and its lifecycle state."""
+
+    def __init__(self, payload, priority=0, script='train_model.py', memory_mb=None, timeout=DEFAULT_JOB_TIMEOUT, tag=None):
+        self.job_id = str(uuid.uuid4())
+        self.payload = payload
+        self.priority = priority
+        self.script = script
+        self.timeout = timeout
+        self.tag = tag
+        self.memory_mb = memory_mb if memory_mb is not None else estimate_job_memory_mb(payload)
+        self.status = QUEUED
+        self.result = None
+        self.threads = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._process = None
+        self._done = threading.Event()
+
+    @property
+    def wait_time(self):
+        end = self.started_at or time.time()
+        return end - self.submitted_at
+
+    def to_dict(self):
+        return {
+            "jobId": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "script": self.script,
+            "estimatedMemoryMb": self.memory_mb,
+            "threads": self.threads,
+            "waitTime": self.wait_time,
+            "runTime": (self.finished_at - self.started_at) if self.started_at and self.finished_at else None
+        }
+
+
+class JobScheduler:
+    """
+    Bounded worker pool with a priority queue and memory-based admission control.
+
+    Each job gets BLAS/OpenMP threads and `n_jobs` when it starts: the free cores divided
+    among the jobs that can start now (at least one each). Threads return to the pool
+    when a job finishes, so later jobs get more as load drops.
+    """
+
+    def __init__(self, max_workers=None, memory_budget_mb=None, total_threads=None, python_path=None, on_finish=None):
+        self.total_threads = total_threads or available_cores()
+        self.max_workers = max(1, min(max_workers or self.total_threads, self.total_threads))
+        self.memory_budget_mb = memory_budget_mb or default_memory_budget_mb()
+        self.python_path = python_path or sys.executable
+        self.on_finish = on_finish
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._finished = deque()
+        self._finished_counts = Counter()
+        self._memory_in_use = 0
+        self._threads_in_use = 0
+        self._running = 0
+        self._wait_times = deque(maxlen=WAIT_TIME_SAMPLES)
+        self._cond = threading.Condition()
+        self._shutdown = False
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"fl-trainer-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        logger.info(
+            f"🗂️ Scheduler ready: {self.max_workers} workers sharing {self.total_threads} threads, "
+            f"memory budget {self.memory_budget_mb} MB"
+        )
+
+    # ---------------- public API ----------------
+
+    def submit(self, payload, priority=0, script='train_model.py', memory_mb=None, timeout=DEFAULT_JOB_TIMEOUT, tag=None):
+        """
+        Queue a job and return its id. Jobs that can never fit the budget fail immediately.
+        `tag` is handed back untouched to `on_finish` (the serve loop uses the caller's request id).
+        """
+        job = TrainingJob(payload, priority=priority, script=script, memory_mb=memory_mb, timeout=timeout, tag=tag)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            self._jobs[job.job_id] = job
+            if job.memory_mb > self.memory_budget_mb:
+                self._finish(job, FAILED, {
+                    "error": f"Job needs ~{job.memory_mb} MB which exceeds the scheduler budget of {self.memory_budget_mb} MB"
+                })
+                return job.job_id
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._cond.notify_all()
+        logger.info(f"📥 Job {job.job_id[:8]} queued (priority {priority}, ~{job.memory_mb} MB)")
+        return job.job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued job or terminate a running one. Returns False if it already finished."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in (COMPLETED, FAILED, CANCELLED):
+                return False
+            if job.status == QUEUED:
+                self._queue = [entry for entry in self._queue if entry[2] is not job]
+                heapq.heapify(self._queue)
+                self._finish(job, CANCELLED, {"error": "Job cancelled before it started"})
+                self._cond.notify_all()
+                return True
+            job.status = CANCELLED
+            process = job._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+        logger.info(f"🛑 Job {job_id[:8]} cancelled while running")
+        return True
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes and return its result (None on timeout)."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if not job._done.wait(timeout):
+            return None
+        return job.result
+
+    def status(self, job_id):
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def metrics(self):
+        """Queue depth, wait-time statistics and resource usage."""
+        with self._cond:
+            counts = Counter(self._finished_counts)
+            for job in self._jobs.values():
+                if job.status in (QUEUED, RUNNING):
+                    counts[job.status] += 1
+            pending_waits = [entry[2].wait_time for entry in self._queue]
+            waits = list(self._wait_times)
+            return {
+                "queueDepth": len(self._queue),
+                "running": counts[RUNNING],
+                "completed": counts[COMPLETED],
+                "failed": counts[FAILED],
+                "cancelled": counts[CANCELLED],
+                "maxWorkers": self.max_workers,
+                "totalThreads": self.total_threads,
+                "threadsInUse": self._threads_in_use,
+                "memoryBudgetMb": self.memory_budget_mb,
+                "memoryInUseMb": self._memory_in_use,
+                "waitTime": {
+                    "count": len(waits),
+                    "mean": sum(waits) / len(waits) if waits else 0.0,
+                    "p95": _percentile(waits, 95),
+                    "max": max(waits) if waits else 0.0,
+                    "oldestQueued": max(pending_waits) if pending_waits else 0.0
+                }
+            }
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for _, _, job in self._queue:
+                    self._finish(job, CANCELLED, {"error": "Scheduler shut down"})
+                self._queue = []
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    # ---------------- internals ----------------
+
+    def _finish(self, job, status, result):
+        job.status = status
+        job.result = result
+        job.finished_at = time.time()
+        job._done.set()
+        self._finished_counts[status] += 1
+        self._finished.append(job.job_id)
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            self._jobs.pop(self._finished.popleft(), None)
+        if self.on_finish is not None:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                logger.warning(f"⚠️ on_finish callback failed for job {job.job_id[:8]} ({e})")
+
+    def _next_admissible_job(self):
+        """
+        Pop the highest-priority job once its memory fits. The head of the queue is never
+        skipped for smaller jobs behind it, so large jobs can't be starved.
+        Must be called with the condition held; returns None on shutdown.
+        """
+        while True:
+            if self._queue:
+                job = self._queue[0][2]
+                if self._memory_in_use + job.memory_mb <= self.memory_budget_mb:
+                    # Share free cores with the other queued jobs idle workers will start now
+                    starting = max(1, min(self.max_workers - self._running, len(self._queue)))
+                    job.threads = max(1, (self.total_threads - self._threads_in_use) // starting)
+                    heapq.heappop(self._queue)
+                    self._memory_in_use += job.memory_mb
+                    self._threads_in_use += job.threads
+                    self._running += 1
+                    job.status = RUNNING
+                    job.started_at = time.time()
+                    self._wait_times.append(job.wait_time)
+                    return job
+            elif self._shutdown:
+                return None
+            self._cond.wait()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = self._next_admissible_job()
+            if job is None:
+                return
+            try:
+                result = self._run(job)
+            except Exception as e:
+                result = {"error": f"Scheduler execution error: {str(e)}"}
+            with self._cond:
+                self._memory_in_use -= job.memory_mb
+                self._threads_in_use -= job.threads
+                self._running -= 1
+                if job.status == CANCELLED:
+                    self._finish(job, CANCELLED, {"error": "Job cancelled while running"})
+                else:
+                    self._finish(job, FAILED if "error" in result else COMPLETED, result)
+                self._cond.notify_all()
+            logger.info(f"✅ Job {job.job_id[:8]} {job.status} after {job.finished_at - job.started_at:.1f}s")
+
+    def _job_env(self, threads):
+        env = dict(os.environ)
+        for var in THREAD_LIMIT_ENV_VARS:
+            env[var] = str(threads)
+        return env
+
+    def _run(self, job):
+        payload = dict(job.payload)
+        payload["config"] = {**(payload.get("config") or {}), "n_jobs": job.threads}
+
+        process = subprocess.Popen(
+            [self.python_path, '-u', os.path.join(ML_BACKEND_DIR, job.script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # inherit: job logs reach the scheduler's stderr (relayed by Node as [SCHEDULER])
+            env=self._job_env(job.threads),
+            text=True
+        )
+        with self._cond:
+            job._process = process
+            cancelled = job.status == CANCELLED
+        if cancelled:
+            process.terminate()
+        try:
+            stdout, _ = process.communicate(json.dumps(payload), timeout=job.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return {"error": f"{job.script} timed out after {job.timeout}s"}
+
+        # Same contract as the Node bridge: the last JSON line is the result
+        for line in reversed(stdout.splitlines()):
+            line = line.strip()
+            if line.startswith('{'):
+                return json.loads(line)
+        return {"error": f"{job.script} exited with code {process.returncode} and no JSON output"}
+
+
+def serve(max_workers=None, memory_budget_mb=None, stdin=sys.stdin, stdout=sys.stdout):
+    """Long-lived scheduler: line-delimited JSON commands in, JSON events out (see module docstring)."""
+    write_lock = threading.Lock()
+
+    def emit(event):
+        with write_lock:
+            stdout.write(json.dumps(event) + "\n")
+            stdout.flush()
+
+    def on_finish(job):
+        emit({"event": "done", "requestId": job.tag, **job.to_dict(), "result": job.result})
+
+    scheduler = JobScheduler(max_workers=max_workers, memory_budget_mb=memory_budget_mb, on_finish=on_finish)
+    requests = {}  # requestId -> jobId, for cancellation
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            command = json.loads(line)
+        except json.JSONDecodeError as e:
+            emit({"event": "error", "error": f"Invalid JSON command: {str(e)}"})
+            continue
+
+        action = command.get("action")
+        request_id = command.get("requestId")
+        try:
+            if action == "submit":
+                job_id = scheduler.submit(
+                    command.get("payload") or {},
+                    priority=command.get("priority", 0),
+                    script=command.get("script", "train_model.py"),
+                    timeout=command.get("timeout", DEFAULT_JOB_TIMEOUT),
+                    tag=request_id
+                )
+                requests[request_id] = job_id
+            elif action == "cancel":
+                job_id = requests.get(command.get("target"))
+                emit({"event": "cancelled", "requestId": request_id, "cancelled": bool(job_id) and scheduler.cancel(job_id)})
+            elif action == "metrics":
+                emit({"event": "metrics", "requestId": request_id, "metrics": scheduler.metrics()})
+            else:
+                emit({"event": "error", "requestId": request_id, "error": f"Unknown scheduler action: {action}"})
+        except Exception as e:
+            emit({"event": "done", "requestId": request_id, "status": FAILED, "result": {"error": f"Scheduler error: {str(e)}"}})
+
+        # Forget request ids of finished jobs so the map stays bounded
+        for rid, job_id in list(requests.items()):
+            status = scheduler.status(job_id)
+            if status is None or status["status"] not in (QUEUED, RUNNING):
+                del requests[rid]
+
+    # stdin closed: the Node process went away, so nobody is waiting for results
+    for job_id in list(requests.values()):
+        scheduler.cancel(job_id)
+    scheduler.shutdown(wait=False, cancel_pending=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+    if "--serve" in sys.argv:
+        serve(
+            max_workers=int(os.environ["HL_SCHEDULER_WORKERS"]) if os.environ.get("HL_SCHEDULER_WORKERS") else None,
+            memory_budget_mb=int(os.environ["HL_SCHEDULER_MEMORY_MB"]) if os.environ.get("HL_SCHEDULER_MEMORY_MB") else None
+        )
+        sys.exit(0)
+    try:
+        request = json.loads(sys.stdin.read().strip() or "{}")
+        jobs = request.get("jobs", [])
+        if not jobs:
+            print(json.dumps({"error": "No jobs provided"}))
+            sys.exit(0)
+
+        scheduler = JobScheduler(
+            max_workers=request.get("maxWorkers"),
+            memory_budget_mb=request.get("memoryBudgetMb")
+        )
+        job_ids = [
+            scheduler.submit(job.get("payload", {}), priority=job.get("priority", 0), script=job.get("script", "train_model.py"))
+            for job in jobs
+        ]
+        results = []
+        for job_id in job_ids:
+            result = scheduler.wait(job_id)
+            results.append({**scheduler.status(job_id), "result": result})
+        scheduler.shutdown()
+        print(json.dumps({"jobs": results, "metrics": scheduler.metrics()}))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
+    except Exception as e:
+        print(json.dumps({"error": f"Execution error: {str(e)}"}))
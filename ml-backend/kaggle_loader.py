@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from scaler_stats import build_scaler, matching_stats
 
 # DATASET LINKS & INFO:
 # 1. Diabetes: https://www.kaggle.com/datasets/uciml/pima-indians-diabetes-database (diabetes.csv)
@@ -9,9 +10,9 @@ from sklearn.preprocessing import StandardScaler
 # 3. Breast Cancer: https://www.kaggle.com/datasets/uciml/breast-cancer-wisconsin-data (data.csv)
 # 4. Pneumonia: https://www.kaggle.com/datasets/paultimothymooney/chest-xray-pneumonia (images)
 
-def load_dataset(disease_type, data_path="datasets/", sample_count=None):
+def load_raw_dataset(disease_type, data_path="datasets/", sample_count=None):
     """
-    Loads and preprocesses real medical datasets from Kaggle.
+    Loads a real medical dataset from Kaggle without scaling.
     Optionally limits to sample_count rows for faster training.
     """
     if disease_type == "diabetes":
@@ -52,9 +53,25 @@ def load_dataset(disease_type, data_path="datasets/", sample_count=None):
         X = X.iloc[indices]
         y = y.iloc[indices]
 
+    return X, y
+
+def load_dataset(disease_type, data_path="datasets/", sample_count=None, scaler_stats=None):
+    """
+    Loads and preprocesses real medical datasets from Kaggle.
+    Optionally limits to sample_count rows for faster training.
+    With scaler_stats (federated count/mean/M2 from scaler_stats.py) every site
+    normalizes with the same global statistics instead of fitting its own scaler.
+    """
+    X, y = load_raw_dataset(disease_type, data_path=data_path, sample_count=sample_count)
+
     # Scale the features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    scaler_stats = matching_stats(scaler_stats, X.shape[1], disease_type)
+    if scaler_stats is not None:
+        scaler = build_scaler(scaler_stats)
+        X_scaled = scaler.transform(X.to_numpy(dtype=float))
+    else:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
     
     return X_scaled, y
 
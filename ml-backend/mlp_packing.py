@@ -0,0 +1,152 @@
+"""
+Packed parameter layout for MLP models ("neural_network" and "cnn").
+
+All weight matrices and bias vectors live in one contiguous float32 buffer, in
+layer order (layer 0 weights, layer 0 bias, layer 1 weights, ...), described by a
+shape table of [fan_in, fan_out] per layer:
+
+    {"params": [...], "layers": [[8, 64], [64, 32], [32, 1]]}
+
+A model's coefs_/intercepts_ are bound as reshaped views into that buffer, so
+warm start, training updates (sklearn's optimizers update parameters in place)
+and extraction all use the same memory. A buffer memory-mapped from the model
+store is used as-is; a JSON list takes one vectorized conversion instead of one
+per layer. Legacy per-layer `layer_{i}_weights` / `layer_{i}_bias` payloads are
+still accepted.
+
+When hidden-layer widths change between rounds (same number of layers), warm
+start is partial: each layer gets freshly initialized weights and the
+overlapping block of the previous layer is copied in. Outgoing weights of newly
+added units start at zero, so if layers only grew the warm-started network
+initially computes the same function as the old one; removed units are simply
+dropped. A change in the number of layers has no sensible overlap and trains cold.
+"""
+import numpy as np
+from sklearn.preprocessing import LabelBinarizer
+from sklearn.utils import check_random_state
+
+PACKED_DTYPE = np.float32
+
+
+def layer_shapes(layer_units):
+    """Shape table [[fan_in, fan_out], ...] for layer sizes [n_features, hidden..., n_outputs]."""
+    return [[int(a), int(b)] for a, b in zip(layer_units[:-1], layer_units[1:])]
+
+
+def packed_size(shapes):
+    return sum(fan_in * fan_out + fan_out for fan_in, fan_out in shapes)
+
+
+def unpack_views(params, shapes):
+    """Split a flat buffer into (coefs, intercepts) views that share its memory."""
+    if params.ndim != 1 or len(params) != packed_size(shapes):
+        raise ValueError(f"Packed MLP buffer has {params.size} values, layer table needs {packed_size(shapes)}")
+    coefs, intercepts = [], []
+    offset = 0
+    for fan_in, fan_out in shapes:
+        coefs.append(params[offset:offset + fan_in * fan_out].reshape(fan_in, fan_out))
+        offset += fan_in * fan_out
+        intercepts.append(params[offset:offset + fan_out])
+        offset += fan_out
+    return coefs, intercepts
+
+
+def bind_packed(model, params, shapes):
+    """Make the model's coefs_/intercepts_ views into `params`."""
+    model.coefs_, model.intercepts_ = unpack_views(params, shapes)
+    model._packed_params = params
+    model._packed_shapes = [list(s) for s in shapes]
+
+
+def pack_mlp(model):
+    """
+    (params, shapes) for a fitted MLP. Returns the bound buffer itself when the model
+    still trains on it; otherwise packs the layers with a single concatenation.
+    """
+    shapes = [list(c.shape) for c in model.coefs_]
+    params = getattr(model, '_packed_params', None)
+    if params is not None and shapes == getattr(model, '_packed_shapes', None):
+        # Early stopping replaces coefs_ with copies of the best iteration; only reuse live views
+        if all(np.may_share_memory(arr, params) for arr in model.coefs_ + model.intercepts_):
+            return params, shapes
+
+    parts = []
+    for coef, intercept in zip(model.coefs_, model.intercepts_):
+        parts.append(coef.ravel())
+        parts.append(intercept)
+    return np.concatenate(parts).astype(PACKED_DTYPE, copy=False), shapes
+
+
+def read_packed(weights):
+    """(params, shapes) from a packed payload or legacy layer_{i} keys; None if neither is present."""
+    if weights.get('params') is not None and weights.get('layers') is not None:
+        shapes = np.asarray(weights['layers'], dtype=np.int64).reshape(-1, 2).tolist()
+        # asarray keeps a float32 memory-mapped buffer from the model store as-is
+        params = np.asarray(weights['params'], dtype=PACKED_DTYPE)
+        if not params.flags.writeable:
+            params = params.copy()
+        unpack_views(params, shapes)  # validates the size
+        return params, shapes
+
+    if 'layer_0_weights' not in weights:
+        return None
+    layers = []
+    i = 0
+    while f'layer_{i}_weights' in weights:
+        layers.append((np.asarray(weights[f'layer_{i}_weights']), np.asarray(weights[f'layer_{i}_bias'])))
+        i += 1
+    shapes = [list(w.shape) for w, _ in layers]
+    params = np.concatenate([part.ravel() for layer in layers for part in layer]).astype(PACKED_DTYPE)
+    return params, shapes
+
+
+def _initialize_binary_mlp(model, layer_units):
+    """Fresh sklearn MLP state for a binary classifier, as the first call to fit() would set it up."""
+    model._label_binarizer = LabelBinarizer().fit([0, 1])
+    model.classes_ = model._label_binarizer.classes_
+    model._random_state = check_random_state(model.random_state)
+    model._initialize(np.zeros((1, 1)), layer_units, PACKED_DTYPE)
+    model.n_features_in_ = layer_units[0]
+
+
+def warm_start_mlp(model, weights, n_features):
+    """
+    Initialize `model` from a previous global MLP so the next fit continues training.
+    Returns "full", "partial" (widths changed) or None (different depth or
+    input/output size; cold training).
+    """
+    packed = read_packed(weights)
+    if packed is None:
+        return None
+    params, shapes = packed
+
+    hidden = model.hidden_layer_sizes
+    hidden = list(hidden) if hasattr(hidden, '__iter__') else [hidden]
+    layer_units = [n_features] + [int(h) for h in hidden] + [1]
+    target_shapes = layer_shapes(layer_units)
+    if len(shapes) != len(target_shapes) or shapes[0][0] != n_features or shapes[-1][1] != 1:
+        return None
+
+    _initialize_binary_mlp(model, layer_units)
+    model.set_params(warm_start=True)
+
+    if shapes == target_shapes:
+        bind_packed(model, params, shapes)
+        mode = "full"
+    else:
+        # Start from fresh initialization and copy in whatever overlaps
+        fresh, _ = pack_mlp(model)
+        bind_packed(model, fresh, target_shapes)
+        src_coefs, src_intercepts = unpack_views(params, shapes)
+        for i, (src_shape, dst_shape) in enumerate(zip(shapes, target_shapes)):
+            rows = min(src_shape[0], dst_shape[0])
+            cols = min(src_shape[1], dst_shape[1])
+            model.coefs_[i][:rows, :cols] = src_coefs[i][:rows, :cols]
+            model.intercepts_[i][:cols] = src_intercepts[i][:cols]
+            # Units the previous layer gained feed nothing yet
+            model.coefs_[i][rows:, :] = 0
+        mode = "partial"
+
+    model._best_coefs = [c.copy() for c in model.coefs_]
+    model._best_intercepts = [i.copy() for i in model.intercepts_]
+    return mode
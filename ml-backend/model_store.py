@@ -0,0 +1,302 @@
+"""
+Local versioned store for global federated models.
+
+Every round Node used to download the full previous global model from IPFS,
+decrypt it and push it into Python as the `globalModel` JSON field, where
+`apply_warm_start` rebuilt every array from lists. The store keeps each
+aggregated model locally, keyed by (modelId, round):
+
+    <root>/<modelId>/round_000003/manifest.json     shapes, dtypes, sha256 per tensor
+    <root>/<modelId>/round_000003/<tensor>.npy      one file per weight tensor
+    <root>/<modelId>/current.json                   version used for warm starts
+
+Tensors are opened as memory-mapped arrays (copy-on-write by default, so an
+optimizer updating weights in place never touches the stored file). Warm start
+then only needs a {"modelId", "round"} reference. Old versions are retired by a
+keep-last-N retention policy; rollback just moves the current pointer.
+
+Run as a script it reads {"action": "put" | "list" | "rollback" | "retire" |
+"diff" | "verify", ...} from stdin and prints the JSON result.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+STORE_DIR_ENV = 'HL_MODEL_STORE_DIR'
+KEEP_ENV = 'HL_MODEL_STORE_KEEP'
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_store')
+DEFAULT_KEEP_LAST = 5
+
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'current.json'
+_ROUND_DIR = re.compile(r'^round_(\d+)$')
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _safe_name(value):
+    """Model ids and tensor names become path components; keep them tame."""
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', str(value))
+    if name in ('', '.', '..'):
+        raise ValueError(f"Invalid store key: {value!r}")
+    return name
+
+
+def _is_tensor(value):
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'fiub'
+    if isinstance(value, list) and value:
+        arr = np.asarray(value)
+        return arr.dtype.kind in 'fiub'
+    return False
+
+
+class ModelStore:
+    """Versioned on-disk store of global model tensors, keyed by (modelId, round)."""
+
+    def __init__(self, root=None, keep_last=None):
+        self.root = root or os.environ.get(STORE_DIR_ENV, DEFAULT_STORE_DIR)
+        self.keep_last = keep_last if keep_last is not None else int(os.environ.get(KEEP_ENV, DEFAULT_KEEP_LAST))
+
+    # ---------------- paths ----------------
+
+    def _model_dir(self, model_id):
+        return os.path.join(self.root, _safe_name(model_id))
+
+    def _version_dir(self, model_id, round_number):
+        return os.path.join(self._model_dir(model_id), f"round_{int(round_number):06d}")
+
+    # ---------------- versions ----------------
+
+    def versions(self, model_id):
+        """Stored rounds for a model, oldest first."""
+        model_dir = self._model_dir(model_id)
+        if not os.path.isdir(model_dir):
+            return []
+        rounds = []
+        for entry in os.listdir(model_dir):
+            match = _ROUND_DIR.match(entry)
+            if match and os.path.exists(os.path.join(model_dir, entry, MANIFEST_FILE)):
+                rounds.append(int(match.group(1)))
+        return sorted(rounds)
+
+    def current_round(self, model_id):
+        """Round warm starts resolve to when none is given (None if the model has no versions)."""
+        pointer = os.path.join(self._model_dir(model_id), CURRENT_FILE)
+        if os.path.exists(pointer):
+            with open(pointer) as f:
+                round_number = json.load(f).get('round')
+            if round_number in self.versions(model_id):
+                return round_number
+        rounds = self.versions(model_id)
+        return rounds[-1] if rounds else None
+
+    def _set_current(self, model_id, round_number):
+        pointer = os.path.join(self._model_dir(model_id), CURRENT_FILE)
+        tmp = f"{pointer}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"round": int(round_number), "updatedAt": time.time()}, f)
+        os.replace(tmp, pointer)
+
+    def manifest(self, model_id, round_number):
+        path = os.path.join(self._version_dir(model_id, round_number), MANIFEST_FILE)
+        if not os.path.exists(path):
+            raise KeyError(f"No stored version for model {model_id} round {round_number}")
+        with open(path) as f:
+            return json.load(f)
+
+    # ---------------- write ----------------
+
+    def put(self, model_id, round_number, weights, metadata=None, make_current=True):
+        """
+        Store a model version. Numeric arrays/lists become .npy tensors; everything else
+        (feature_names, n_estimators, ...) is kept in the manifest. An optional
+        `dtypes` entry ({name: dtype}) sets the on-disk dtype of tensors that arrive as
+        JSON lists, e.g. the float32 packed MLP buffer. The version directory
+        is written to a temp dir and renamed into place, so readers never see half a version.
+        """
+        model_dir = self._model_dir(model_id)
+        os.makedirs(model_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging_', dir=model_dir)
+
+        tensors, extras = {}, {}
+        dtypes = weights.get('dtypes') or {}
+        try:
+            for name, value in weights.items():
+                if not _is_tensor(value):
+                    extras[name] = value
+                    continue
+                arr = np.ascontiguousarray(value, dtype=dtypes.get(name))
+                filename = f"{_safe_name(name)}.npy"
+                path = os.path.join(staging, filename)
+                np.save(path, arr, allow_pickle=False)
+                tensors[name] = {
+                    "file": filename,
+                    "shape": list(arr.shape),
+                    "dtype": arr.dtype.str,
+                    "sha256": _sha256(path)
+                }
+
+            manifest = {
+                "modelId": str(model_id),
+                "round": int(round_number),
+                "createdAt": time.time(),
+                "tensors": tensors,
+                "extras": extras,
+                "metadata": metadata or {}
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            target = self._version_dir(model_id, round_number)
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if make_current:
+            self._set_current(model_id, round_number)
+        self.retire(model_id)
+        return manifest
+
+    # ---------------- read ----------------
+
+    def get(self, model_id, round_number=None, mmap_mode='c', verify=False):
+        """
+        Load a version as {name: memory-mapped array} plus its non-tensor extras.
+        `round_number=None` resolves to the current version.
+        """
+        if round_number is None:
+            round_number = self.current_round(model_id)
+            if round_number is None:
+                raise KeyError(f"No stored versions for model {model_id}")
+        manifest = self.manifest(model_id, round_number)
+        if verify:
+            self.verify(model_id, round_number, manifest=manifest)
+
+        version_dir = self._version_dir(model_id, round_number)
+        weights = dict(manifest.get('extras', {}))
+        for name, info in manifest['tensors'].items():
+            weights[name] = np.load(os.path.join(version_dir, info['file']), mmap_mode=mmap_mode, allow_pickle=False)
+        return weights
+
+    def verify(self, model_id, round_number, manifest=None):
+        """Check every tensor file against its recorded checksum; raises ValueError on mismatch."""
+        manifest = manifest or self.manifest(model_id, round_number)
+        version_dir = self._version_dir(model_id, round_number)
+        for name, info in manifest['tensors'].items():
+            path = os.path.join(version_dir, info['file'])
+            if not os.path.exists(path) or _sha256(path) != info['sha256']:
+                raise ValueError(f"Checksum mismatch for tensor '{name}' (model {model_id}, round {round_number})")
+        return True
+
+    # ---------------- lifecycle ----------------
+
+    def rollback(self, model_id, round_number):
+        """Point warm starts back at an earlier stored version."""
+        if int(round_number) not in self.versions(model_id):
+            raise KeyError(f"No stored version for model {model_id} round {round_number}")
+        self.verify(model_id, round_number)
+        self._set_current(model_id, round_number)
+        return int(round_number)
+
+    def retire(self, model_id, keep_last=None, pinned=()):
+        """
+        Delete all but the newest `keep_last` versions. The current version and any
+        pinned rounds are always kept. Returns the retired rounds.
+        """
+        keep_last = self.keep_last if keep_last is None else keep_last
+        rounds = self.versions(model_id)
+        keep = set(rounds[-keep_last:]) if keep_last > 0 else set()
+        keep.update(int(r) for r in pinned)
+        current = self.current_round(model_id)
+        if current is not None:
+            keep.add(current)
+
+        retired = []
+        for round_number in rounds:
+            if round_number not in keep:
+                shutil.rmtree(self._version_dir(model_id, round_number), ignore_errors=True)
+                retired.append(round_number)
+        return retired
+
+    def diff(self, model_id, round_a, round_b):
+        """Per-tensor change between two rounds: L2 norm, max abs and relative change."""
+        a = self.get(model_id, round_a, mmap_mode='r')
+        b = self.get(model_id, round_b, mmap_mode='r')
+        tensor_names = set(self.manifest(model_id, round_a)['tensors']) | set(self.manifest(model_id, round_b)['tensors'])
+
+        report = {}
+        for name in sorted(tensor_names):
+            if name not in a or name not in b:
+                report[name] = {"status": "added" if name in b else "removed"}
+                continue
+            if a[name].shape != b[name].shape:
+                report[name] = {"status": "reshaped", "from": list(a[name].shape), "to": list(b[name].shape)}
+                continue
+            delta = np.asarray(b[name], dtype=np.float64) - np.asarray(a[name], dtype=np.float64)
+            base_norm = float(np.linalg.norm(a[name]))
+            l2 = float(np.linalg.norm(delta))
+            report[name] = {
+                "status": "changed" if l2 > 0 else "unchanged",
+                "l2": l2,
+                "maxAbs": float(np.max(np.abs(delta))) if delta.size else 0.0,
+                "relative": l2 / base_norm if base_norm > 0 else None
+            }
+        return {"modelId": str(model_id), "from": int(round_a), "to": int(round_b), "tensors": report}
+
+
+def handle(request, store=None):
+    """Dispatch a JSON command from the Node bridge."""
+    store = store or ModelStore(root=request.get('root'))
+    action = request.get('action')
+    model_id = request.get('modelId')
+    if not model_id:
+        return {"error": "Missing modelId"}
+
+    if action == 'put':
+        manifest = store.put(model_id, request['round'], request.get('weights') or {}, metadata=request.get('metadata'))
+        return {"stored": True, "round": manifest['round'], "tensors": list(manifest['tensors'])}
+    if action == 'list':
+        return {"versions": store.versions(model_id), "current": store.current_round(model_id)}
+    if action == 'rollback':
+        current = store.rollback(model_id, request['round'])
+        # The caller moves its own global-model pointer (e.g. the CID) along with the store
+        return {"current": current, "metadata": store.manifest(model_id, current).get('metadata', {})}
+    if action == 'retire':
+        return {"retired": store.retire(model_id, keep_last=request.get('keepLast'), pinned=request.get('pinned', ()))}
+    if action == 'diff':
+        return store.diff(model_id, request['from'], request['to'])
+    if action == 'verify':
+        return {"valid": store.verify(model_id, request['round'])}
+    return {"error": f"Unknown model store action: {action}"}
+
+
+if __name__ == "__main__":
+    try:
+        input_raw = sys.stdin.read().strip()
+        if not input_raw:
+            print(json.dumps({"error": "No input data provided via stdin"}))
+        else:
+            print(json.dumps(handle(json.loads(input_raw))))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
+    except (KeyError, ValueError) as e:
+        print(json.dumps({"error": str(e)}))
+    except Exception as e:
+        print(json.dumps({"error": f"Execution error: {str(e)}"}))
@@ -0,0 +1,222 @@
+"""
+Opt-in profiling for train/evaluate requests.
+
+Enable per request with `"profile": true` (or "full" / "sampled", or
+{"mode": ..., "dir": ...}) in the input JSON, or for every request with the
+HL_PROFILE environment variable. Artifacts go to HL_PROFILE_DIR
+(default: ml-backend/profiles/).
+
+- full:    cProfile stats (.prof + readable .txt), tracemalloc top allocators and
+           peak RSS in a .json summary. Accurate but slows the request down.
+- sampled: a background thread samples the main thread's stack every
+           HL_PROFILE_INTERVAL_MS (default 10ms) and writes folded stacks
+           (flamegraph format) plus a summary. Low enough overhead to leave on.
+
+When profiling is off `profile_request` does nothing beyond one dict/env lookup.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = 'HL_PROFILE'
+PROFILE_DIR_ENV = 'HL_PROFILE_DIR'
+PROFILE_INTERVAL_ENV = 'HL_PROFILE_INTERVAL_MS'
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+DEFAULT_INTERVAL_MS = 10
+TOP_N = 30
+TRACEMALLOC_FRAMES = 10
+
+MODES = ('full', 'sampled')
+
+# Module imports triggered inside the request are not interesting allocators
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, tracemalloc.__file__)
+)
+
+
+def _normalize_mode(value):
+    if value in (None, False, '', '0', 'false', 'off'):
+        return None
+    if value in (True, '1', 'true', 'on'):
+        return 'full'
+    if value in MODES:
+        return value
+    logger.warning(f"⚠️ Unknown profiling mode {value!r}; profiling disabled")
+    return None
+
+
+def resolve_profiling(input_data=None):
+    """Return (mode, output_dir) for a request; mode is None when profiling is off."""
+    request_setting = (input_data or {}).get('profile')
+    out_dir = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+    if isinstance(request_setting, dict):
+        out_dir = request_setting.get('dir', out_dir)
+        request_setting = request_setting.get('mode', 'full')
+    mode = _normalize_mode(request_setting)
+    if mode is None and request_setting is None:
+        mode = _normalize_mode(os.environ.get(PROFILE_ENV))
+    return mode, out_dir
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts folded stacks."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hl-profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top_functions(self, n=TOP_N):
+        """Functions ranked by samples where they were on top of the stack."""
+        leaf_counts = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(';', 1)[-1]] += count
+        return [{"function": fn, "samples": count, "share": count / self.samples}
+                for fn, count in leaf_counts.most_common(n)] if self.samples else []
+
+
+def _artifact_base(out_dir, name):
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(out_dir, f"{name}-{stamp}-{os.getpid()}")
+
+
+def _write_full(base, profiler, snapshot, traced_peak, wall_time, name):
+    profiler.dump_stats(f"{base}.prof")
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(TOP_N)
+    with open(f"{base}.txt", 'w') as f:
+        f.write(text.getvalue())
+
+    allocators = [
+        {"location": str(stat.traceback[0]), "sizeMb": stat.size / (1024 * 1024), "count": stat.count}
+        for stat in snapshot.statistics('lineno')[:TOP_N]
+    ]
+    summary = {
+        "request": name,
+        "mode": "full",
+        "wallTime": wall_time,
+        "peakRssMb": peak_rss_mb(),
+        "tracedPeakMb": traced_peak / (1024 * 1024),
+        "topAllocators": allocators,
+        "files": {"stats": f"{base}.prof", "report": f"{base}.txt"}
+    }
+    with open(f"{base}.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def _write_sampled(base, sampler, wall_time, name):
+    with open(f"{base}.folded", 'w') as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    summary = {
+        "request": name,
+        "mode": "sampled",
+        "wallTime": wall_time,
+        "peakRssMb": peak_rss_mb(),
+        "intervalMs": sampler.interval * 1000,
+        "samples": sampler.samples,
+        "topFunctions": sampler.top_functions(),
+        "files": {"stacks": f"{base}.folded"}
+    }
+    with open(f"{base}.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+@contextmanager
+def profile_request(name, input_data=None):
+    """
+    Profile the enclosed block if the request or environment asks for it.
+    Artifact write failures are logged and never affect the request itself.
+    """
+    mode, out_dir = resolve_profiling(input_data)
+    if mode is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    if mode == 'sampled':
+        interval_ms = float(os.environ.get(PROFILE_INTERVAL_ENV, DEFAULT_INTERVAL_MS))
+        sampler = StackSampler(threading.get_ident(), interval_ms / 1000)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            try:
+                base = _artifact_base(out_dir, name)
+                _write_sampled(base, sampler, time.perf_counter() - start, name)
+                logger.info(f"📈 Sampled profile written to {base}.json")
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write profiling artifacts ({e})")
+        return
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        if not already_tracing:
+            tracemalloc.stop()
+        try:
+            base = _artifact_base(out_dir, name)
+            _write_full(base, profiler, snapshot, traced_peak, time.perf_counter() - start, name)
+            logger.info(f"📈 Profile written to {base}.json")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write profiling artifacts ({e})")
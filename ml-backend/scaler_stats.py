@@ -0,0 +1,229 @@
+"""
+Federated feature-scaling statistics.
+
+`load_dataset` used to fit a fresh StandardScaler on each participant's local data,
+so every hospital normalized features differently and averaged coefficients mixed
+incompatible scales. Instead each site computes a per-feature summary
+(count, mean, M2 = sum of squared deviations) of its raw data — no rows leave the
+site — and the summaries are merged with Chan et al.'s parallel variance formula
+into one global mean/variance. The merged statistics are cached per disease,
+feature space and dataset version and reused by training and evaluation.
+
+Kaggle datasets and record-derived features (medical records, bulk exports) have
+different columns for the same disease, so they are separate feature spaces with
+their own statistics. Statistics whose width doesn't match the data are ignored
+with a warning rather than failing the job.
+
+Run as a script it reads one of these from stdin and prints the JSON result:
+    {"action": "local", "disease": ..., "dataSource": "kaggle" | "medical_records" | "bulk_export", ...}
+    {"action": "merge", "disease": ..., "datasetVersion": ..., "featureSpace": ..., "summaries": [...]}
+    {"action": "get",   "disease": ..., "datasetVersion": ..., "featureSpace": ...}
+"""
+import json
+import logging
+import os
+import re
+import sys
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+CACHE_DIR_ENV = 'HL_SCALER_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'scaler_stats')
+LATEST_VERSION = 'latest'
+
+KAGGLE_SPACE = 'kaggle'
+RECORDS_SPACE = 'records'
+FEATURE_SPACES = (KAGGLE_SPACE, RECORDS_SPACE)
+
+logger = logging.getLogger(__name__)
+
+
+def local_stats(X):
+    """Per-feature count/mean/M2 summary of a site's raw (unscaled) feature matrix."""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2 or len(X) == 0:
+        raise ValueError("Need a non-empty 2-D feature matrix to compute scaling statistics")
+    mean = X.mean(axis=0)
+    m2 = ((X - mean) ** 2).sum(axis=0)
+    return {"count": int(len(X)), "mean": mean.tolist(), "m2": m2.tolist()}
+
+
+def merge_stats(summaries):
+    """Combine site summaries into global count/mean/M2 (exact, order-independent up to rounding)."""
+    summaries = [s for s in summaries if s and s.get("count", 0) > 0]
+    if not summaries:
+        raise ValueError("No non-empty scaling summaries to merge")
+
+    count = 0
+    mean = None
+    m2 = None
+    for summary in summaries:
+        n_b = summary["count"]
+        mean_b = np.asarray(summary["mean"], dtype=np.float64)
+        m2_b = np.asarray(summary["m2"], dtype=np.float64)
+        if mean is None:
+            count, mean, m2 = n_b, mean_b, m2_b
+            continue
+        if mean_b.shape != mean.shape:
+            raise ValueError(f"Feature count mismatch between summaries ({mean.shape[0]} vs {mean_b.shape[0]})")
+        total = count + n_b
+        delta = mean_b - mean
+        mean = mean + delta * (n_b / total)
+        m2 = m2 + m2_b + delta ** 2 * (count * n_b / total)
+        count = total
+
+    return {
+        "count": int(count),
+        "mean": mean.tolist(),
+        "m2": m2.tolist(),
+        "var": (m2 / count).tolist(),
+        "sites": len(summaries)
+    }
+
+
+def build_scaler(stats):
+    """A fitted StandardScaler that applies the given (merged) statistics."""
+    mean = np.asarray(stats["mean"], dtype=np.float64)
+    var = np.asarray(stats["var"], dtype=np.float64) if "var" in stats else np.asarray(stats["m2"], dtype=np.float64) / stats["count"]
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scale = np.sqrt(var)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0  # constant features, as StandardScaler does
+    scaler.scale_ = scale
+    scaler.n_features_in_ = len(mean)
+    scaler.n_samples_seen_ = int(stats["count"])
+    return scaler
+
+
+# ---------------- cache ----------------
+
+def _cache_dir():
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+
+def feature_space(data_source):
+    """Feature space a data source produces: Kaggle columns or record-derived columns."""
+    return KAGGLE_SPACE if (data_source or "kaggle") == "kaggle" else RECORDS_SPACE
+
+
+def _cache_path(disease, version, space):
+    if space not in FEATURE_SPACES:
+        raise ValueError(f"Unknown feature space: {space}")
+    safe_version = re.sub(r'[^A-Za-z0-9_.-]', '_', str(version))
+    return os.path.join(_cache_dir(), f"{disease}_{space}_{safe_version}.json")
+
+
+def cache_global_stats(disease, version, stats, space=KAGGLE_SPACE):
+    """Persist merged statistics for (disease, feature space, dataset version) and mark them as latest."""
+    os.makedirs(_cache_dir(), exist_ok=True)
+    entry = {**stats, "disease": disease, "featureSpace": space, "datasetVersion": str(version)}
+    for path in (_cache_path(disease, version, space), _cache_path(disease, LATEST_VERSION, space)):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    return entry
+
+
+def load_global_stats(disease, version=None, space=KAGGLE_SPACE):
+    """Cached statistics for a disease and feature space (latest version if none given), or None."""
+    path = _cache_path(disease, version if version is not None else LATEST_VERSION, space)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_scaler_stats(input_data, disease):
+    """
+    Scaler statistics requested by a train/evaluate payload: inline `scalerStats` or
+    cached `scalerStatsVersion` for the feature space of its `dataSource`.
+    """
+    inline = input_data.get("scalerStats")
+    if inline:
+        return inline
+    if "scalerStatsVersion" in input_data:
+        version = input_data.get("scalerStatsVersion")
+        space = feature_space(input_data.get("dataSource"))
+        stats = load_global_stats(disease, version, space)
+        if stats is None:
+            logger.warning(
+                f"⚠️ No cached {space} scaling statistics for {disease} version {version!r}; "
+                f"training without shared statistics, which will not match other sites"
+            )
+        return stats
+    return None
+
+
+def matching_stats(stats, n_features, disease):
+    """`stats` if they cover `n_features` columns; otherwise warn and return None."""
+    if stats is None or len(stats["mean"]) == n_features:
+        return stats
+    logger.warning(
+        f"⚠️ Scaler statistics cover {len(stats['mean'])} features but {disease} data has {n_features}; "
+        f"ignoring them"
+    )
+    return None
+
+
+# ---------------- site-side summary ----------------
+
+def site_feature_matrix(input_data):
+    """Raw (unscaled) local features for the data source a site trains on."""
+    disease = input_data.get("disease")
+    data_source = input_data.get("dataSource", "kaggle")
+    if data_source == "kaggle":
+        from kaggle_loader import load_raw_dataset
+        datasets_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets/")
+        X, _ = load_raw_dataset(disease, data_path=datasets_path, sample_count=input_data.get("sampleCount"))
+        return X.to_numpy(dtype=np.float64)
+    if data_source == "medical_records":
+        return np.asarray((input_data.get("customData") or {}).get("features", []), dtype=np.float64)
+    if data_source == "bulk_export":
+        from bulk_loader import load_bulk_export
+        bulk_export = input_data.get("bulkExport") or {}
+        X, _ = load_bulk_export(bulk_export.get("path"), disease, fmt=bulk_export.get("format"))
+        return X
+    raise ValueError(f"Unknown data source: {data_source}")
+
+
+def handle(request):
+    action = request.get("action")
+    disease = request.get("disease")
+    if not disease:
+        return {"error": "Missing disease type"}
+
+    if action == "local":
+        summary = local_stats(site_feature_matrix(request))
+        return {**summary, "featureSpace": feature_space(request.get("dataSource"))}
+    if action == "merge":
+        version = request.get("datasetVersion")
+        if version is None:
+            return {"error": "Missing datasetVersion"}
+        space = request.get("featureSpace", KAGGLE_SPACE)
+        summaries = request.get("summaries", [])
+        if any(s.get("featureSpace", space) != space for s in summaries if s):
+            return {"error": f"Summaries from different feature spaces cannot be merged into {space}"}
+        return cache_global_stats(disease, version, merge_stats(summaries), space)
+    if action == "get":
+        space = request.get("featureSpace", KAGGLE_SPACE)
+        stats = load_global_stats(disease, request.get("datasetVersion"), space)
+        return stats if stats else {"error": f"No cached {space} scaling statistics for {disease}"}
+    return {"error": f"Unknown scaler stats action: {action}"}
+
+
+if __name__ == "__main__":
+    try:
+        input_raw = sys.stdin.read().strip()
+        if not input_raw:
+            print(json.dumps({"error": "No input data provided via stdin"}))
+        else:
+            print(json.dumps(handle(json.loads(input_raw))))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}))
+    except Exception as e:
+        print(json.dumps({"error": f"Execution error: {str(e)}"}))
@@ -0,0 +1,70 @@
+"""
+Merged gradient boosting ensembles score exactly the sample-weighted average of the
+site ensembles, and trees restored from the previous global model are kept once.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hist_boosting import (
+    _deserialize_predictors,
+    create_hist_gradient_boosting,
+    merge_hist_gradient_boosting,
+    restore_hist_gradient_boosting,
+    serialize_hist_gradient_boosting
+)
+
+X, y = make_classification(n_samples=1200, n_features=6, random_state=0)
+SITES = np.array_split(np.arange(len(X)), 3)
+WEIGHTS = [len(rows) for rows in SITES]
+
+
+def _train_sites(global_payload=None):
+    payloads = []
+    for i, rows in enumerate(SITES):
+        # Different budgets per site, as early stopping gives different n_iter
+        model = create_hist_gradient_boosting({"n_estimators": 10 + 5 * i})
+        if global_payload:
+            restore_hist_gradient_boosting(model, global_payload, X.shape[1], rounds_to_add=5 + 2 * i)
+        model.fit(X[rows], y[rows])
+        payloads.append(serialize_hist_gradient_boosting(model))
+    return payloads
+
+
+def _raw_scores(reference, payload):
+    reference._predictors = _deserialize_predictors(payload)
+    reference._baseline_prediction = np.asarray(payload["baseline"]).reshape(1, -1)
+    return reference._raw_predict(X).ravel()
+
+
+def test_merge_is_weighted_average_of_sites():
+    reference = create_hist_gradient_boosting({}).fit(X, y)
+    global_payload = None
+    for _ in range(2):
+        sites = _train_sites(global_payload)
+        merged = merge_hist_gradient_boosting(sites, WEIGHTS)
+        expected = np.average([_raw_scores(reference, p) for p in sites], axis=0, weights=WEIGHTS)
+        np.testing.assert_allclose(_raw_scores(reference, merged), expected, atol=1e-10)
+
+        previous = global_payload["n_iter"] if global_payload else 0
+        assert merged["n_iter"] == previous + sum(p["n_iter"] - previous for p in sites)
+        global_payload = merged
+
+
+def test_merge_rejects_mismatched_models():
+    sites = _train_sites()
+    sites[1] = dict(sites[1], n_features=sites[1]["n_features"] + 1)
+    with pytest.raises(ValueError, match="n_features"):
+        merge_hist_gradient_boosting(sites, WEIGHTS)
+
+
+def test_restore_checks_site_labels():
+    payload = _train_sites()[0]
+    assert restore_hist_gradient_boosting(create_hist_gradient_boosting({}), payload, X.shape[1], classes=y)
+    assert not restore_hist_gradient_boosting(create_hist_gradient_boosting({}), payload, X.shape[1], classes=y + 1)
+    assert not restore_hist_gradient_boosting(create_hist_gradient_boosting({}), payload, X.shape[1], classes=[0, 1, 2])
@@ -0,0 +1,67 @@
+"""
+Scheduler admission estimates and bookkeeping, without running training jobs.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_scheduler import JobScheduler, estimate_job_memory_mb
+
+
+def _bulk_payload(path, fmt):
+    return {"disease": "diabetes", "dataSource": "bulk_export", "bulkExport": {"path": str(path), "format": fmt}}
+
+
+def test_bulk_export_estimate_follows_file_size(tmp_path):
+    small, large = tmp_path / "small.csv", tmp_path / "large.csv"
+    small.write_bytes(b"r1,BMI,33.6000\n" * 1000)
+    with open(large, "wb") as f:
+        f.truncate(512 * 1024 * 1024)
+
+    kaggle = estimate_job_memory_mb({"disease": "diabetes"})
+    assert estimate_job_memory_mb(_bulk_payload(small, "csv")) <= kaggle
+    assert estimate_job_memory_mb(_bulk_payload(large, "csv")) - kaggle > 1000
+    # Binary tuples are bigger per row, so the same file holds fewer records
+    assert estimate_job_memory_mb(_bulk_payload(large, "binary")) < estimate_job_memory_mb(_bulk_payload(large, "csv"))
+
+
+def _report_threads_script(tmp_path):
+    script = tmp_path / "report_threads.py"
+    script.write_text(
+        "import json, os, sys, time\n"
+        "payload = json.loads(sys.stdin.read())\n"
+        "time.sleep(0.2)\n"
+        "print(json.dumps({'omp': int(os.environ['OMP_NUM_THREADS']), 'n_jobs': payload['config']['n_jobs']}))\n"
+    )
+    return str(script)
+
+
+def test_threads_are_assigned_at_dispatch(tmp_path):
+    script = _report_threads_script(tmp_path)
+    scheduler = JobScheduler(max_workers=4, total_threads=8, memory_budget_mb=10000)
+    try:
+        alone = scheduler.wait(scheduler.submit({}, script=script, memory_mb=1), timeout=30)
+        assert alone == {"omp": 8, "n_jobs": 8}
+
+        with scheduler._cond:  # queue all four before any worker picks one up
+            job_ids = [scheduler.submit({}, script=script, memory_mb=1) for _ in range(4)]
+        results = [scheduler.wait(job_id, timeout=30) for job_id in job_ids]
+        assert [r["omp"] for r in results] == [2, 2, 2, 2]
+        assert scheduler.metrics()["threadsInUse"] == 0
+    finally:
+        scheduler.shutdown()
+
+
+def test_wait_time_samples_are_bounded(tmp_path, monkeypatch):
+    import job_scheduler
+    monkeypatch.setattr(job_scheduler, "WAIT_TIME_SAMPLES", 3)
+    scheduler = JobScheduler(max_workers=1, total_threads=1, memory_budget_mb=10000)
+    try:
+        script = _report_threads_script(tmp_path)
+        for _ in range(5):
+            scheduler.wait(scheduler.submit({}, script=script, memory_mb=1), timeout=30)
+        metrics = scheduler.metrics()
+        assert metrics["completed"] == 5 and metrics["waitTime"]["count"] == 3
+    finally:
+        scheduler.shutdown()
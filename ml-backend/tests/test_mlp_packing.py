@@ -0,0 +1,44 @@
+"""
+Partial MLP warm start: widening hidden layers keeps the network's function,
+changing its depth trains cold.
+"""
+import os
+import sys
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.neural_network import MLPClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mlp_packing import pack_mlp, warm_start_mlp
+
+X, y = make_classification(n_samples=300, n_features=5, random_state=0)
+
+
+def _global_weights(hidden):
+    model = MLPClassifier(hidden_layer_sizes=hidden, max_iter=50, random_state=0).fit(X, y)
+    params, shapes = pack_mlp(model)
+    return model, {"params": params.tolist(), "layers": shapes}
+
+
+def test_same_shapes_is_full_warm_start():
+    previous, weights = _global_weights((8, 4))
+    model = MLPClassifier(hidden_layer_sizes=(8, 4), random_state=1)
+    assert warm_start_mlp(model, weights, X.shape[1]) == "full"
+    np.testing.assert_allclose(model.predict_proba(X), previous.predict_proba(X), atol=1e-5)
+
+
+def test_wider_layers_keep_the_function():
+    previous, weights = _global_weights((8, 4))
+    model = MLPClassifier(hidden_layer_sizes=(12, 6), random_state=1)
+    assert warm_start_mlp(model, weights, X.shape[1]) == "partial"
+    np.testing.assert_allclose(model.predict_proba(X), previous.predict_proba(X), atol=1e-5)
+
+
+def test_depth_change_trains_cold():
+    _, weights = _global_weights((8, 4))
+    for hidden in ((8,), (8, 4, 4)):
+        model = MLPClassifier(hidden_layer_sizes=hidden, random_state=1)
+        assert warm_start_mlp(model, weights, X.shape[1]) is None
+        assert not hasattr(model, "coefs_")
@@ -0,0 +1,66 @@
+"""
+Merged site summaries reproduce the global mean/variance, a requested statistics
+version that was never cached is reported instead of ignored, and record-derived
+features use their own statistics rather than the Kaggle ones.
+"""
+import logging
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scaler_stats import cache_global_stats, handle, local_stats, merge_stats, resolve_scaler_stats
+from train_model import train
+
+
+def test_merge_matches_pooled_statistics():
+    rng = np.random.default_rng(0)
+    sites = [rng.normal(loc=i, scale=i + 1, size=(50 + 30 * i, 4)) for i in range(3)]
+    merged = merge_stats([local_stats(X) for X in sites])
+    pooled = np.vstack(sites)
+    np.testing.assert_allclose(merged["mean"], pooled.mean(axis=0))
+    np.testing.assert_allclose(merged["var"], pooled.var(axis=0))
+
+
+def test_resolve_cached_and_missing_versions(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("HL_SCALER_CACHE_DIR", str(tmp_path))
+    cache_global_stats("diabetes", "round-1", merge_stats([local_stats(np.eye(3))]))
+    assert resolve_scaler_stats({"scalerStatsVersion": "round-1"}, "diabetes")["datasetVersion"] == "round-1"
+
+    with caplog.at_level(logging.WARNING):
+        assert resolve_scaler_stats({"scalerStatsVersion": "round-2"}, "diabetes") is None
+    assert "round-2" in caplog.text
+
+
+def _cvd_records(n=80):
+    # Record-derived cvd features have 10 columns; the Kaggle cvd dataset has 13
+    rng = np.random.default_rng(1)
+    features = rng.normal(loc=50, scale=10, size=(n, 10))
+    labels = (features[:, 0] > 50).astype(int)
+    return {"features": features.tolist(), "labels": labels.tolist()}
+
+
+def test_medical_records_train_with_round_statistics(tmp_path, monkeypatch):
+    monkeypatch.setenv("HL_SCALER_CACHE_DIR", str(tmp_path))
+    custom_data = _cvd_records()
+    for source, extra in (("kaggle", {}), ("medical_records", {"customData": custom_data})):
+        summary = handle({"action": "local", "disease": "cvd", "dataSource": source, **extra})
+        assert handle({"action": "merge", "disease": "cvd", "datasetVersion": "round-3",
+                       "featureSpace": summary["featureSpace"], "summaries": [summary]}).get("error") is None
+
+    result = train({"disease": "cvd", "dataSource": "medical_records", "customData": custom_data,
+                    "scalerStatsVersion": "round-3"})
+    assert "error" not in result
+    assert result["metrics"]["scaling"] == "federated"
+
+
+def test_mismatched_statistics_are_ignored(caplog):
+    kaggle_width = merge_stats([local_stats(np.ones((2, 13)) + np.eye(2, 13))])
+    with caplog.at_level(logging.WARNING):
+        result = train({"disease": "cvd", "dataSource": "medical_records", "customData": _cvd_records(),
+                        "scalerStats": kaggle_width})
+    assert "error" not in result
+    assert result["metrics"]["scaling"] == "none"
+    assert "13 features" in caplog.text
@@ -0,0 +1,46 @@
+"""
+zk_artifact rebuilds the commitment from submitted weights and rejects artifacts that
+do not encode them.
+"""
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from train_model import train
+from zk_artifact import handle
+
+
+@pytest.fixture(scope="module", params=["logistic_regression", "neural_network", "gradient_boosting"])
+def trained(request):
+    # Round-trip through JSON, as the weights arrive at /rounds/submit
+    return json.loads(json.dumps(train({"disease": "diabetes", "modelType": request.param, "config": {"max_iter": 20}})))
+
+
+def test_build_matches_training_artifact(trained):
+    rebuilt = handle({"action": "build", "weights": trained["weights"]})
+    assert rebuilt["root"] == trained["zkArtifact"]["root"]
+    assert rebuilt["circuitInputs"] == trained["zkArtifact"]["circuitInputs"]
+
+
+def test_verify_accepts_matching_artifact(trained):
+    result = handle({"action": "verify", "weights": trained["weights"], "artifact": trained["zkArtifact"]})
+    assert result["valid"] and result["reason"] is None
+
+
+def test_verify_rejects_artifact_for_other_weights(trained):
+    artifact = copy.deepcopy(trained["zkArtifact"])
+    artifact["circuitInputs"]["modelWeightsRaw"][0] = "1"
+    result = handle({"action": "verify", "weights": trained["weights"], "artifact": artifact})
+    assert not result["valid"]
+
+
+@pytest.mark.parametrize("chunk_size", ["abc", 0, -1, 512, None, 1024.5])
+def test_verify_rejects_other_chunk_sizes(trained, chunk_size):
+    artifact = dict(trained["zkArtifact"], chunkSize=chunk_size)
+    result = handle({"action": "verify", "weights": trained["weights"], "artifact": artifact})
+    assert result.get("error") is None and not result["valid"]
@@ -13,6 +13,18 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import accuracy_score, log_loss, precision_score, recall_score, f1_score, confusion_matrix
 from kaggle_loader import load_dataset, get_train_test_split
+from bulk_loader import load_bulk_export, DEFAULT_CHUNK_ROWS
+from zk_artifact import build_proof_artifact
+from profiling import profile_request
+from model_store import ModelStore
+from scaler_stats import resolve_scaler_stats, build_scaler, matching_stats
+from mlp_packing import pack_mlp, warm_start_mlp
+from hist_boosting import (
+    create_hist_gradient_boosting,
+    hist_boosting_tensors,
+    serialize_hist_gradient_boosting,
+    restore_hist_gradient_boosting
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,8 +37,12 @@ def create_model(model_type, config):
         return RandomForestClassifier(
             n_estimators=config.get("n_estimators", 100),
             max_depth=config.get("max_depth", 10),
+            n_jobs=config.get("n_jobs"),
             random_state=42
         )
+    elif model_type == 'gradient_boosting':
+        # Histogram-binned boosting: scales to large cohorts, multi-threaded, early stopping
+        return create_hist_gradient_boosting(config)
     elif model_type == 'neural_network':
         return MLPClassifier(
             hidden_layer_sizes=config.get("hidden_layers", (64, 32)),
@@ -53,33 +69,42 @@ def create_model(model_type, config):
         )
 
 
-def extract_weights(model, model_type):
-    """Extract model weights/parameters for federated averaging."""
+def model_tensors(model, model_type):
+    """Named parameter arrays of a fitted model (what gets federated and committed to in ZK proofs)."""
     if model_type == 'random_forest':
-        # For Random Forest, extract feature importances as a proxy for weights
+        # For Random Forest, feature importances act as a proxy for weights
         # (true weight-level FedAvg not possible with tree ensembles)
-        return {
-            "feature_importances": model.feature_importances_.tolist(),
-            "n_estimators": model.n_estimators,
-            "feature_names": []
-        }
+        return {"feature_importances": model.feature_importances_}
+    elif model_type == 'gradient_boosting':
+        return hist_boosting_tensors(model)
     elif model_type in ('neural_network', 'cnn'):
-        # MLP weights: list of weight matrices and bias vectors per layer
-        weights = {}
-        for i, (coef, intercept) in enumerate(zip(model.coefs_, model.intercepts_)):
-            weights[f"layer_{i}_weights"] = coef.tolist()
-            weights[f"layer_{i}_bias"] = intercept.tolist()
+        # MLP weights: all layers packed into one float32 buffer (layer shapes go in extract_weights)
+        params, _ = pack_mlp(model)
+        return {"params": params}
+    else:  # logistic_regression
+        return {"coef": model.coef_, "intercept": model.intercept_}
+
+
+def extract_weights(model, model_type, tensors=None):
+    """Extract model weights/parameters for federated averaging."""
+    if model_type == 'gradient_boosting':
+        # Trees can't be averaged element-wise; ship the compact serialized ensemble instead
+        weights = serialize_hist_gradient_boosting(model)
         weights["feature_names"] = []
         return weights
-    else:  # logistic_regression
-        return {
-            "coef": model.coef_.tolist(),
-            "intercept": model.intercept_.tolist(),
-            "feature_names": []
-        }
+    if tensors is None:
+        tensors = model_tensors(model, model_type)
+    weights = {name: arr.tolist() for name, arr in tensors.items()}
+    if model_type == 'random_forest':
+        weights["n_estimators"] = model.n_estimators
+    elif model_type in ('neural_network', 'cnn'):
+        weights["layers"] = [list(coef.shape) for coef in model.coefs_]
+        weights["dtypes"] = {"params": "float32"}
+    weights["feature_names"] = []
+    return weights
 
 
-def apply_warm_start(model, global_model, model_type, n_features):
+def apply_warm_start(model, global_model, model_type, n_features, classes=None):
     """
     Initialize a freshly created sklearn model with weights from the previous
     global federated model so that training continues from the last round
@@ -97,9 +122,10 @@ def apply_warm_start(model, global_model, model_type, n_features):
         if model_type == 'logistic_regression':
             coef = global_model.get('coef')
             intercept = global_model.get('intercept')
-            if coef and intercept:
-                coef_arr = np.array(coef)
-                intercept_arr = np.array(intercept)
+            if coef is not None and intercept is not None and len(coef) and len(intercept):
+                # asarray keeps memory-mapped tensors from the model store as-is
+                coef_arr = np.asarray(coef)
+                intercept_arr = np.asarray(intercept)
                 # Guard: only apply if feature dimensions match
                 if coef_arr.shape[-1] == n_features:
                     model.set_params(warm_start=True)
@@ -115,31 +141,29 @@ def apply_warm_start(model, global_model, model_type, n_features):
                     )
 
         elif model_type in ('neural_network', 'cnn'):
-            # Check if layer 0 weights exist and match feature count
-            layer_0_key = 'layer_0_weights'
-            if layer_0_key in global_model:
-                w0 = np.array(global_model[layer_0_key])
-                if w0.shape[0] == n_features:
-                    # Reconstruct all layer weight matrices and bias vectors
-                    coefs, intercepts = [], []
-                    i = 0
-                    while f'layer_{i}_weights' in global_model:
-                        coefs.append(np.array(global_model[f'layer_{i}_weights']))
-                        intercepts.append(np.array(global_model[f'layer_{i}_bias']))
-                        i += 1
-                    if coefs:
-                        model.set_params(warm_start=True)
-                        model.coefs_ = coefs
-                        model.intercepts_ = intercepts
-                        model.n_iter_ = 0
-                        model.n_layers_ = len(coefs) + 1
-                        model.n_outputs_ = 1
-                        model.out_activation_ = 'logistic'
-                        logger.info(f"✅ Warm-start applied: MLP ({len(coefs)} layers)")
+            # Packed float32 buffer (or legacy layer_{i} keys); layers are bound as views into it
+            if global_model.get('params') is not None or 'layer_0_weights' in global_model:
+                mode = warm_start_mlp(model, global_model, n_features)
+                if mode == "full":
+                    logger.info(f"✅ Warm-start applied: MLP ({len(model.coefs_)} layers, packed)")
+                elif mode == "partial":
+                    logger.info(f"✅ Partial warm-start applied: MLP hidden layers changed to {[c.shape[1] for c in model.coefs_[:-1]]}")
                 else:
                     logger.warning(
-                        f"⚠️ Warm-start skipped: layer_0 shape {w0.shape} vs "
-                        f"current n_features={n_features}. Cold training."
+                        f"⚠️ Warm-start skipped: stored MLP depth or input/output size doesn't match "
+                        f"current hidden layers and n_features={n_features}. Cold training."
+                    )
+
+        elif model_type == 'gradient_boosting':
+            # Restore the previous ensemble; this round's fit adds new boosting iterations on top
+            if global_model.get('trees'):
+                if restore_hist_gradient_boosting(model, global_model, n_features, classes=classes):
+                    logger.info(f"✅ Warm-start applied: HistGradientBoosting ({int(global_model['n_iter'])} iterations)")
+                else:
+                    logger.warning(
+                        f"⚠️ Warm-start skipped: stored n_features={global_model.get('n_features')}, "
+                        f"classes={global_model.get('classes')} vs current n_features={n_features}, "
+                        f"classes={None if classes is None else np.unique(classes).tolist()}. Cold training."
                     )
 
         elif model_type == 'random_forest':
@@ -165,7 +189,11 @@ def train(input_data):
     data_source = input_data.get("dataSource", "kaggle")
     sample_count = input_data.get("sampleCount")
     custom_data = input_data.get("customData")
+    bulk_export = input_data.get("bulkExport")
     datasets_path = os.path.join(os.path.dirname(__file__), "datasets/")
+    # Global (federated) scaling statistics shared by all sites, if the round provides them
+    scaler_stats = resolve_scaler_stats(input_data, disease)
+    scaling = "federated" if scaler_stats else "local"
     
     logger.info(f"🚀 Starting production training for {disease} model (type: {model_type}, source: {data_source})...")
     
@@ -176,9 +204,11 @@ def train(input_data):
         # Load data based on source type
         if data_source == "kaggle":
             try:
-                X_kaggle, y_kaggle = load_dataset(disease, data_path=datasets_path, sample_count=sample_count)
+                X_kaggle, y_kaggle = load_dataset(disease, data_path=datasets_path, sample_count=sample_count, scaler_stats=scaler_stats)
                 X_all = X_kaggle
                 y_all = y_kaggle
+                if scaler_stats and len(scaler_stats["mean"]) != X_kaggle.shape[1]:
+                    scaling = "local"  # load_dataset ignored them (and warned)
                 logger.info(f"✅ Kaggle dataset loaded. Samples: {len(X_kaggle)}")
             except FileNotFoundError as e:
                 return {"error": f"Dataset file missing for {disease}. Please upload real Kaggle data to ml-backend/datasets/"}
@@ -193,9 +223,30 @@ def train(input_data):
                 X_all = np.array(features)
                 y_all = np.array(labels)
                 logger.info(f"✅ Medical records loaded. Samples: {len(X_all)}")
+
+        elif data_source == "bulk_export":
+            # Diagnostic metrics exported with COPY ... TO (or a local dump) — parsed in chunks
+            export_path = (bulk_export or {}).get("path")
+            if not export_path or not os.path.exists(export_path):
+                return {"error": f"Bulk export file not found: {export_path}"}
+            X_all, y_all = load_bulk_export(
+                export_path,
+                disease,
+                fmt=bulk_export.get("format"),
+                chunk_rows=bulk_export.get("chunkRows") or DEFAULT_CHUNK_ROWS
+            )
+            logger.info(f"✅ Bulk export loaded. Samples: {len(X_all)}")
         
         if X_all is None or len(X_all) == 0:
             return {"error": f"No training data available for {disease}. Check dataset files or medical records."}
+
+        if data_source != "kaggle":
+            # Record-derived features arrive unscaled; only normalize them with shared global statistics
+            scaler_stats = matching_stats(scaler_stats, np.shape(X_all)[1], disease)
+            if scaler_stats:
+                X_all = build_scaler(scaler_stats).transform(np.asarray(X_all, dtype=float))
+            else:
+                scaling = "none"
         
         # Apply sample count limit
         if sample_count and X_all is not None and y_all is not None and sample_count < len(X_all):
@@ -238,11 +289,24 @@ def train(input_data):
         model = create_model(model_type, config)
         logger.info(f"🧠 Using model: {model.__class__.__name__}")
 
-        # Apply warm-start from previous global model if available
+        # Apply warm-start from previous global model if available.
+        # A globalModelRef points at the local model store and avoids shipping the weights as JSON.
         global_model = input_data.get('globalModel')
+        global_model_ref = input_data.get('globalModelRef')
+        if not global_model and global_model_ref:
+            try:
+                global_model = ModelStore().get(
+                    global_model_ref.get('modelId'),
+                    global_model_ref.get('round'),
+                    verify=global_model_ref.get('verify', False)
+                )
+                logger.info(f"📦 Global model loaded from model store ({global_model_ref.get('modelId')}, round {global_model_ref.get('round', 'current')})")
+            except (KeyError, ValueError, OSError) as e:
+                logger.warning(f"⚠️ Model store lookup failed ({e}). Cold training.")
+                global_model = None
         if global_model:
             logger.info("🔄 Global model provided — attempting warm-start initialization...")
-            model = apply_warm_start(model, global_model, model_type, X_train.shape[1])
+            model = apply_warm_start(model, global_model, model_type, X_train.shape[1], classes=y_train)
         else:
             logger.info("🆕 No global model provided — cold training from scratch.")
 
@@ -257,8 +321,10 @@ def train(input_data):
         y_prob = model.predict_proba(X_test)
         loss = log_loss(y_test, y_prob)
         
-        # Extract weights based on model type
-        weights = extract_weights(model, model_type)
+        # Extract weights based on model type; the ZK artifact is built from the same arrays
+        tensors = model_tensors(model, model_type)
+        weights = extract_weights(model, model_type, tensors)
+        zk_artifact = build_proof_artifact(tensors)
         
         end_time = time.time()
         training_time = end_time - start_time
@@ -280,6 +346,7 @@ def train(input_data):
         
         return {
             "weights": weights,
+            "zkArtifact": zk_artifact,
             "accuracy": float(accuracy),
             "loss": float(loss),
             "trainingTime": training_time,
@@ -293,6 +360,7 @@ def train(input_data):
                 "iterations": iterations,
                 "modelType": model_type,
                 "dataSource": data_source,
+                "scaling": scaling,
                 "totalAvailable": len(X_all) if X_all is not None else 0
             }
         }
@@ -308,16 +376,18 @@ if __name__ == "__main__":
             input_raw = sys.stdin.read().strip()
             if input_raw:
                 input_data = json.loads(input_raw)
-                result = train(input_data)
-                print(json.dumps(result))
+                with profile_request("train", input_data):
+                    output = json.dumps(train(input_data))
+                print(output)
             else:
                 print(json.dumps({"error": "No input data provided via stdin"}))
         else:
             # Fallback for manual CLI testing
             if len(sys.argv) > 1:
                 input_data = json.loads(sys.argv[1])
-                result = train(input_data)
-                print(json.dumps(result))
+                with profile_request("train", input_data):
+                    output = json.dumps(train(input_data))
+                print(output)
             else:
                 print(json.dumps({"error": "No input data provided via stdin or argv"}))
     except json.JSONDecodeError as e:
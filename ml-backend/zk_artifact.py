@@ -0,0 +1,248 @@
+"""
+Proof-ready encoding of model weights for the ZK training circuit.
+
+zkProofService used to hash only the first 10 weights, rebuilt in JS from the JSON
+weight dump. This module produces, in the same pass as `extract_weights`:
+
+- a deterministic fixed-point encoding of *all* weights (floor(w * 10^6), the same
+  scaling zkProofService applies) mapped into the BN254 scalar field used by circom
+- a chunked Merkle commitment over the whole encoded vector, so a proof can bind
+  the full model through one root plus per-chunk inclusion paths
+- the 10-element chunk the current ModelTraining.circom Poseidon(11) consumes
+
+Leaves hash fixed-size chunks of the big-endian int64 encoding with SHA-256
+(RFC 6962 style 0x00/0x01 domain separation), so the cost is one vectorized
+encode plus ~n/chunk_size hashes — cheap even for large MLPs.
+
+Run as a script it reads {"action": "build" | "verify", "weights": {...}, "artifact": {...}}
+from stdin: the server rebuilds the artifact from submitted weights, and checks one
+sent by a client against them. `--benchmark` times encoding and commitment against
+model size instead.
+"""
+import hashlib
+import json
+import sys
+import time
+
+import numpy as np
+
+# BN254 scalar field (the field circom/snarkjs circuits operate in)
+FIELD_PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+FIXED_POINT_SCALE = 10 ** 6
+DEFAULT_CHUNK_SIZE = 1024
+CIRCUIT_WEIGHT_INPUTS = 10  # ModelTraining.circom: modelWeightsRaw[10]
+
+# |w| above this would overflow int64 after scaling; real weights are nowhere near it
+MAX_ABS_WEIGHT = float(2 ** 62) / FIXED_POINT_SCALE
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+# Entries of a serialized weights payload that describe the model rather than being committed
+METADATA_KEYS = ('feature_names', 'layers', 'dtypes')
+
+
+def flatten_tensors(tensors):
+    """
+    Concatenate named parameter arrays into one float64 vector.
+    Tensors are taken in sorted name order so the layout never depends on dict order.
+    Returns (vector, layout) where layout records name/shape/offset for each tensor.
+    """
+    layout = []
+    parts = []
+    offset = 0
+    for name in sorted(tensors):
+        arr = np.asarray(tensors[name], dtype=np.float64)
+        layout.append({"name": name, "shape": list(arr.shape), "offset": offset})
+        parts.append(arr.ravel())
+        offset += arr.size
+    vector = np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+    return vector, layout
+
+
+def encode_fixed_point(vector, scale=FIXED_POINT_SCALE):
+    """Deterministic fixed-point encoding: floor(w * scale) as int64."""
+    vector = np.asarray(vector, dtype=np.float64)
+    if not np.all(np.isfinite(vector)):
+        raise ValueError("Cannot encode non-finite weights (NaN/inf)")
+    if vector.size and np.max(np.abs(vector)) > MAX_ABS_WEIGHT:
+        raise ValueError("Weight magnitude too large for fixed-point encoding")
+    return np.floor(vector * scale).astype(np.int64)
+
+
+def to_field_elements(encoded):
+    """Map signed fixed-point integers into the BN254 field as decimal strings (negatives wrap to p - |q|)."""
+    return [str(int(q) % FIELD_PRIME) for q in encoded]
+
+
+def _leaf_hashes(encoded, chunk_size):
+    data = encoded.astype('>i8', copy=False).tobytes()
+    step = chunk_size * 8
+    return [hashlib.sha256(LEAF_PREFIX + data[i:i + step]).digest() for i in range(0, max(len(data), 1), step)]
+
+
+def _merkle_levels(leaves):
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        current = levels[-1]
+        parents = [
+            hashlib.sha256(NODE_PREFIX + current[i] + current[i + 1]).digest()
+            for i in range(0, len(current) - 1, 2)
+        ]
+        if len(current) % 2:
+            parents.append(current[-1])  # unpaired node is promoted unchanged
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(leaves):
+    return _merkle_levels(leaves)[-1][0]
+
+
+def inclusion_path(leaves, index):
+    """Sibling hashes (hex, with side) proving leaf `index` is under the root. Leaves may be bytes or hex."""
+    leaves = [bytes.fromhex(leaf) if isinstance(leaf, str) else leaf for leaf in leaves]
+    path = []
+    for level in _merkle_levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append({"hash": level[sibling].hex(), "left": sibling < index})
+        index //= 2
+    return path
+
+
+def verify_inclusion(leaf_hash_hex, path, root_hex):
+    node = bytes.fromhex(leaf_hash_hex)
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        pair = sibling + node if step["left"] else node + sibling
+        node = hashlib.sha256(NODE_PREFIX + pair).digest()
+    return node.hex() == root_hex
+
+
+def build_proof_artifact(tensors, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Build the proof-ready artifact for a dict of named parameter arrays
+    (the same tensors `extract_weights` serializes).
+    """
+    vector, layout = flatten_tensors(tensors)
+    encoded = encode_fixed_point(vector)
+    leaves = _leaf_hashes(encoded, chunk_size)
+    root = merkle_root(leaves)
+
+    circuit_weights = encoded[:CIRCUIT_WEIGHT_INPUTS]
+    circuit_weights = np.pad(circuit_weights, (0, CIRCUIT_WEIGHT_INPUTS - len(circuit_weights)))
+
+    return {
+        "encoding": {
+            "scheme": "fixed_point",
+            "scale": FIXED_POINT_SCALE,
+            "rounding": "floor",
+            "field": "bn254"
+        },
+        "layout": layout,
+        "nWeights": int(vector.size),
+        "chunkSize": chunk_size,
+        "leaves": [leaf.hex() for leaf in leaves],
+        "root": root.hex(),
+        "rootField": str(int.from_bytes(root, 'big') % FIELD_PRIME),
+        "circuitInputs": {
+            "modelWeightsRaw": to_field_elements(circuit_weights)
+        }
+    }
+
+
+def weights_tensors(weights):
+    """
+    Recover the committed tensors from a serialized weights payload (what
+    `extract_weights` returns), so an artifact can be rebuilt from submitted weights.
+    """
+    if weights.get("format") == "hist_gradient_boosting":
+        from hist_boosting import payload_tensors
+        return payload_tensors(weights)
+
+    tensors = {}
+    for name, value in weights.items():
+        if name in METADATA_KEYS or not isinstance(value, list) or not value:
+            continue
+        arr = np.asarray(value, dtype=np.float64)
+        tensors[name] = arr
+    return tensors
+
+
+def verify_artifact(weights, artifact):
+    """
+    Check a client-supplied artifact against the weights it claims to encode.
+    Returns (valid, reason, rebuilt artifact). The server only accepts its own chunk size.
+    """
+    rebuilt = build_proof_artifact(weights_tensors(weights))
+    chunk_size = artifact.get("chunkSize")
+    if type(chunk_size) is not int or chunk_size != rebuilt["chunkSize"]:
+        return False, f"chunkSize must be {rebuilt['chunkSize']}", rebuilt
+    if artifact.get("layout") != rebuilt["layout"]:
+        return False, "tensor layout does not match the submitted weights", rebuilt
+    if artifact.get("root") != rebuilt["root"]:
+        return False, "commitment root does not match the submitted weights", rebuilt
+    if (artifact.get("circuitInputs") or {}).get("modelWeightsRaw") != rebuilt["circuitInputs"]["modelWeightsRaw"]:
+        return False, "circuit inputs do not match the submitted weights", rebuilt
+    return True, None, rebuilt
+
+
+def handle(request):
+    weights = request.get("weights")
+    if not isinstance(weights, dict):
+        return {"error": "Missing weights"}
+    action = request.get("action", "build")
+    if action == "build":
+        return build_proof_artifact(weights_tensors(weights))
+    if action == "verify":
+        if not isinstance(request.get("artifact"), dict):
+            return {"error": "Missing artifact"}
+        valid, reason, rebuilt = verify_artifact(weights, request["artifact"])
+        return {"valid": valid, "reason": reason, "artifact": rebuilt}
+    return {"error": f"Unknown ZK artifact action: {action}"}
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000, 5_000_000), chunk_size=DEFAULT_CHUNK_SIZE, repeats=3):
+    """Time encoding and commitment for synthetic weight vectors of increasing size."""
+    rng = np.random.default_rng(42)
+    rows = []
+    for size in sizes:
+        tensors = {"layer_0_weights": rng.normal(0, 0.1, size)}
+        encode_times, commit_times = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            vector, _ = flatten_tensors(tensors)
+            encoded = encode_fixed_point(vector)
+            encode_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            merkle_root(_leaf_hashes(encoded, chunk_size))
+            commit_times.append(time.perf_counter() - start)
+        rows.append({
+            "weights": size,
+            "encode_ms": min(encode_times) * 1000,
+            "commit_ms": min(commit_times) * 1000,
+            "leaves": -(-size // chunk_size)
+        })
+    return rows
+
+
+if __name__ == "__main__" and "--benchmark" in sys.argv:
+    print(f"🔐 Fixed-point encoding + chunked commitment benchmark (chunk size {DEFAULT_CHUNK_SIZE})")
+    print(f"{'weights':>12} {'leaves':>8} {'encode (ms)':>12} {'commit (ms)':>12}")
+    for row in benchmark():
+        print(f"{row['weights']:>12,} {row['leaves']:>8,} {row['encode_ms']:>12.2f} {row['commit_ms']:>12.2f}")
+elif __name__ == "__main__":
+    try:
+        input_raw = sys.stdin.read().strip()
+        if not input_raw:
+            print(json.dumps({"error": "No input data provided via stdin"}))
+        else:
+            print(json.dumps(handle(json.loads(input_raw))))
+    except json.JSONDecodeError as e:
+        print(json.dumps({"error": f"Invalid JSON input: {str(e)}"}))
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}))
+    except Exception as e:
+        print(json.dumps({"error": f"Execution error: {str(e)}"}))
@@ -140,6 +140,41 @@ router.delete("/models/:modelId", authMiddleware, async (req, res) => {
     }
 });
 
+// Roll the global model back to an earlier stored round (Admin only)
+router.post("/models/:modelId/rollback", authMiddleware, async (req, res) => {
+    try {
+        const { modelId } = req.params;
+        const { round } = req.body;
+
+        if (round === undefined) {
+            return res.status(400).json({ error: "round required" });
+        }
+
+        let restored;
+        try {
+            restored = await mlModelService.rollbackGlobalModelVersion(modelId, round);
+        } catch (storeError) {
+            return res.status(400).json({ error: storeError.message });
+        }
+        if (!restored.cid) {
+            return res.status(400).json({ error: `Stored round ${restored.round} has no IPFS CID to roll back to` });
+        }
+
+        // Warm starts follow fl_models.global_model_ipfs, so the pointer moves with the store
+        await db.query(
+            `UPDATE fl_models SET global_model_ipfs = $1, updated_at = CURRENT_TIMESTAMP WHERE model_id = $2`,
+            [restored.cid, modelId]
+        );
+        console.log(`⏪ Global model ${modelId} rolled back to round ${restored.round} (${restored.cid})`);
+
+        res.json({ success: true, modelId, ...restored });
+
+    } catch (error) {
+        console.error("Rollback model error:", error);
+        res.status(500).json({ error: error.message });
+    }
+});
+
 // Get global FL statistics
 router.get("/stats", async (req, res) => {
     try {
@@ -223,11 +258,14 @@ router.get("/models/:modelId", async (req, res) => {
 // Start new training round
 router.post("/rounds/start", authMiddleware, async (req, res) => {
     try {
-        const { modelId } = req.body;
+        const { modelId, scalerSummaries } = req.body;
 
         if (!modelId) {
             return res.status(400).json({ error: "Model ID required" });
         }
+        if (scalerSummaries !== undefined && !Array.isArray(scalerSummaries)) {
+            return res.status(400).json({ error: "scalerSummaries must be an array of site summaries" });
+        }
 
         // Initiate round on blockchain
         const roundId = await flService.initiateFLRound(modelId);
@@ -248,10 +286,22 @@ router.post("/rounds/start", authMiddleware, async (req, res) => {
             [round.roundNumber, modelId]
         );
 
+        // Global feature-scaling statistics every site trains this round with
+        let scaling = null;
+        try {
+            const modelRow = await db.query(`SELECT disease FROM fl_models WHERE model_id = $1`, [modelId]);
+            if (modelRow.rows.length > 0) {
+                scaling = await mlModelService.prepareRoundScalerStats(modelRow.rows[0].disease, roundId, scalerSummaries || []);
+            }
+        } catch (scalingError) {
+            console.warn(`⚠️ Could not prepare federated scaling statistics for round ${roundId}: ${scalingError.message}. Sites will scale locally.`);
+        }
+
         res.json({
             success: true,
             roundId,
-            round
+            round,
+            scaling
         });
 
     } catch (error) {
@@ -275,6 +325,16 @@ router.post("/rounds/train", authMiddleware, async (req, res) => {
             return res.status(400).json({ error: "Model ID required" });
         }
 
+        // bulk_export reads a COPY export of diagnostic_metrics from the server's export directory
+        let bulkExport = null;
+        if (dataSource === 'bulk_export') {
+            try {
+                bulkExport = mlModelService.resolveBulkExport(req.body.bulkExport);
+            } catch (err) {
+                return res.status(400).json({ error: err.message });
+            }
+        }
+
         // Get model details from DB: disease type, model type, and latest global model CID
         const modelResult = await db.query(
             "SELECT disease, model_type, global_model_ipfs FROM fl_models WHERE model_id = $1",
@@ -289,6 +349,17 @@ router.post("/rounds/train", authMiddleware, async (req, res) => {
         const modelType = modelResult.rows[0].model_type;
         const globalModelCID = modelResult.rows[0].global_model_ipfs;
         const source = dataSource || 'kaggle';
+
+        // Scale with the statistics merged when the active round started
+        const activeRound = await db.query(
+            `SELECT round_id FROM fl_rounds
+       WHERE model_id = $1 AND status IN ('initiated', 'training')
+       ORDER BY round_number DESC LIMIT 1`,
+            [modelId]
+        );
+        const scalerStatsVersion = activeRound.rows.length > 0
+            ? mlModelService.roundScalerStatsVersion(activeRound.rows[0].round_id)
+            : null;
         const limit = sampleCount || samples || null;
 
         console.log(`🧠 [ASYNC] Initiating local training for ${disease} model (${modelType})...`);
@@ -313,7 +384,16 @@ router.post("/rounds/train", authMiddleware, async (req, res) => {
             let globalModel = null;
             let warmStartMode = 'cold'; // tracked for status reporting
 
-            if (globalModelCID) {
+            // Prefer the local model store: Python memory-maps the tensors, no IPFS round trip
+            const globalModelRef = globalModelCID
+                ? mlModelService.getStoredGlobalModelRef(modelId, globalModelCID)
+                : null;
+            if (globalModelRef) {
+                warmStartMode = 'warm';
+                console.log(`📦 Warm-start: global model found in local store (round ${globalModelRef.round})`);
+            }
+
+            if (globalModelCID && !globalModelRef) {
                 const MAX_RETRIES = 3;
                 const BASE_DELAY_MS = 2000; // 2s → 4s → 8s
 
@@ -358,6 +438,9 @@ router.post("/rounds/train", authMiddleware, async (req, res) => {
                     modelId,
                     modelType,
                     globalModel,   // null on cold/cold_fallback, real weights on warm
+                    globalModelRef,
+                    bulkExport,
+                    scalerStatsVersion,
                     hhNumber: req.body.hhNumber || null
                 });
             } catch (err) {
@@ -455,6 +538,17 @@ router.get("/training/status/:modelId", async (req, res) => {
     }
 });
 
+// Shared training queue: depth, wait times, memory in use
+router.get("/training/scheduler", async (req, res) => {
+    try {
+        const metrics = await mlModelService.getSchedulerMetrics();
+        res.json({ success: true, ...metrics });
+    } catch (error) {
+        console.error("Scheduler metrics error:", error);
+        res.status(500).json({ error: error.message });
+    }
+});
+
 // Check patient trainability for a disease
 router.get("/trainability-check/:disease", async (req, res) => {
     try {
@@ -477,7 +571,7 @@ router.get("/trainability-check/:disease", async (req, res) => {
 // Submit model update
 router.post("/rounds/submit", authMiddleware, async (req, res) => {
     try {
-        const { roundId, modelWeights, trainingMetrics } = req.body;
+        const { roundId, modelWeights, trainingMetrics, zkArtifact } = req.body;
 
         if (!roundId || !modelWeights || !trainingMetrics) {
             return res.status(400).json({ error: "Missing required fields" });
@@ -524,14 +618,34 @@ router.post("/rounds/submit", authMiddleware, async (req, res) => {
             return res.status(400).json({ error: "Invalid trainingMetrics. Expected numbers for accuracy, loss, and samplesTrained." });
         }
 
+        // Commit to the submitted weights; a client artifact is only used if it matches them
+        let trustedArtifact;
+        try {
+            trustedArtifact = await mlModelService.buildZkArtifact(modelWeights, zkArtifact);
+        } catch (artifactError) {
+            if (artifactError.code === 'ZK_ARTIFACT_MISMATCH') {
+                return res.status(400).json({ error: artifactError.message });
+            }
+            throw artifactError;
+        }
+        // The proof covers a slice of the weights; the root commits to all of them
+        const modelCommitment = {
+            encoding: trustedArtifact.encoding,
+            root: trustedArtifact.root,
+            rootField: trustedArtifact.rootField,
+            nWeights: trustedArtifact.nWeights,
+            chunkSize: trustedArtifact.chunkSize,
+            layout: trustedArtifact.layout
+        };
+
         // Generate ZK proof
-        const proof = await zkProofService.generateProof(modelWeights, trainingMetrics);
+        const proof = await zkProofService.generateProof(modelWeights, { ...trainingMetrics, zkArtifact: trustedArtifact });
 
         // Upload model to IPFS
         let modelUpdateIPFS;
         try {
             modelUpdateIPFS = await mlModelService.uploadModelToIPFS(
-                { modelWeights, ...trainingMetrics },
+                { modelWeights, ...trainingMetrics, modelCommitment },
                 `round-${roundId}`
             );
         } catch (ipfsError) {
@@ -562,8 +676,9 @@ router.post("/rounds/submit", authMiddleware, async (req, res) => {
             `INSERT INTO fl_contributions 
        (round_id, participant_address, model_update_ipfs, zk_proof_hash, 
         local_accuracy, local_loss, local_precision, local_recall, local_f1, local_auc, local_cm,
-        samples_trained, zk_proof_verified)
-       VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)`,
+        samples_trained, zk_proof_verified,
+        model_commitment_root, model_commitment_field, model_n_weights, model_chunk_size, model_layout)
+       VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)`,
             [
                 roundId,
                 req.user.walletAddress,
@@ -577,14 +692,20 @@ router.post("/rounds/submit", authMiddleware, async (req, res) => {
                 trainingMetrics.auc || null,
                 trainingMetrics.confusionMatrix ? JSON.stringify(trainingMetrics.confusionMatrix) : null,
                 trainingMetrics.samplesTrained,
-                isVerified
+                isVerified,
+                modelCommitment.root,
+                modelCommitment.rootField,
+                modelCommitment.nWeights,
+                modelCommitment.chunkSize,
+                JSON.stringify(modelCommitment.layout)
             ]
         );
 
         res.json({
             success: true,
             proofHash: proof.proofHash,
-            modelUpdateIPFS
+            modelUpdateIPFS,
+            modelCommitment
         });
 
     } catch (error) {
@@ -646,7 +767,7 @@ router.post("/rounds/aggregate", authMiddleware, async (req, res) => {
 
         // Perform Byzantine-robust aggregation (Krum)
         // Defend against model poisoning attacks by selecting honest updates
-        const aggregatedModel = mlModelService.byzantineRobustAggregation(modelUpdates, 1);
+        const aggregatedModel = await mlModelService.aggregateModelUpdates(modelUpdates, { robust: true, f: 1 });
 
         // Upload aggregated model to IPFS
         const aggregatedIPFS = await mlModelService.uploadModelToIPFS(
@@ -705,6 +826,12 @@ router.post("/rounds/aggregate", authMiddleware, async (req, res) => {
                 ]
             );
             console.log(`✅ Warm-start: global_model_ipfs updated on fl_models (${aggregatedIPFS})`);
+
+            try {
+                await mlModelService.storeGlobalModelVersion(modelId, roundId, aggregatedModel.modelWeights, aggregatedIPFS);
+            } catch (storeErr) {
+                console.warn(`⚠️ Could not cache global model locally: ${storeErr.message}. Next round will load it from IPFS.`);
+            }
         }
 
         res.json({
@@ -834,7 +961,7 @@ router.post("/rounds/complete", authMiddleware, async (req, res) => {
                     };
                 })
             );
-            realAggregatedModel = mlModelService.federatedAverage(modelUpdates);
+            realAggregatedModel = await mlModelService.aggregateModelUpdates(modelUpdates);
             aggregatedModelIPFS = await mlModelService.uploadModelToIPFS(
                 realAggregatedModel,
                 `round-${roundId}-aggregated`
@@ -898,6 +1025,14 @@ router.post("/rounds/complete", authMiddleware, async (req, res) => {
         );
         console.log(`✅ Warm-start: global_model_ipfs updated on fl_models (${aggregatedModelIPFS})`);
 
+        if (realAggregatedModel) {
+            try {
+                await mlModelService.storeGlobalModelVersion(round.modelId, roundId, realAggregatedModel.modelWeights, aggregatedModelIPFS);
+            } catch (storeErr) {
+                console.warn(`⚠️ Could not cache global model locally: ${storeErr.message}. Next round will load it from IPFS.`);
+            }
+        }
+
         // --- PHASE 1 REWARD INTEGRATION ---
         // Decoupled reward processing to ensure round completion succeeds
         (async () => {
@@ -10,6 +10,7 @@
 const { query } = require("../config/database");
 
 // Feature columns expected by each disease model (must match kaggle_loader.py column order)
+// Mirrored in ml-backend/bulk_loader.py for bulk COPY exports — keep both in sync
 const DISEASE_FEATURE_MAPS = {
     diabetes: {
         columns: ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'],
@@ -13,6 +13,8 @@ const featureExtractor = require("./medicalRecordFeatureExtractor");
  */
 
 const ML_BACKEND_DIR = path.join(__dirname, "..", "ml-backend");
+const MODEL_STORE_DIR = process.env.HL_MODEL_STORE_DIR || path.join(ML_BACKEND_DIR, "model_store");
+const BULK_EXPORT_DIR = process.env.HL_BULK_EXPORT_DIR || path.join(ML_BACKEND_DIR, "exports");
 const MODEL_CACHE = new Map();
 
 // In-memory training status tracking for real-time progress
@@ -38,10 +40,13 @@ function clearTrainingStatus(modelId) {
  * Train a local model on hospital's data
  * @param {string} disease - Disease type (diabetes, cvd, cancer, pneumonia)
  * @param {Object} options - Training options
- * @param {string} options.dataSource - 'kaggle' | 'medical_records' | 'combined'
+ * @param {string} options.dataSource - 'kaggle' | 'medical_records' | 'bulk_export' | 'combined'
  * @param {number} options.sampleCount - Max samples to use
+ * @param {Object} options.bulkExport - { path, format } of a diagnostic_metrics COPY export (bulk_export source, see resolveBulkExport)
  * @param {string} options.modelId - Model ID for progress tracking
  * @param {Object} options.globalModel - Current global model (optional)
+ * @param {Object} options.globalModelRef - { modelId, round } in the local model store, used instead of globalModel
+ * @param {string} options.scalerStatsVersion - Dataset version of cached federated scaling statistics (see mergeScalerStats)
  * @param {Object} options.config - Training configuration
  * @returns {Promise<Object>} Trained model and metrics
  */
@@ -52,7 +57,10 @@ async function trainLocalModel(disease, options = {}) {
         modelId = null,
         modelType = 'logistic_regression',
         globalModel = null,
+        globalModelRef = null,
         hhNumber = null,
+        bulkExport = null,
+        scalerStatsVersion = null,
         config = {}
     } = options;
 
@@ -107,10 +115,13 @@ async function trainLocalModel(disease, options = {}) {
             disease,
             data: null,
             globalModel: globalModel,
+            globalModelRef: globalModelRef,
             modelType,
             dataSource,
             sampleCount: sampleCount || null,
             customData: customData,
+            bulkExport: dataSource === 'bulk_export' ? bulkExport : null,
+            ...(scalerStatsVersion ? { scalerStatsVersion } : {}),
             config: {
                 max_iter: config.epochs || 1000,
                 C: config.C || 1.0,
@@ -149,7 +160,7 @@ async function trainLocalModel(disease, options = {}) {
         // Call Python ML backend
         let result;
         try {
-            result = await callPythonML("train_model.py", inputData);
+            result = await runScheduledPythonML("train_model.py", inputData);
         } finally {
             if (progressInterval) clearInterval(progressInterval);
         }
@@ -177,6 +188,7 @@ async function trainLocalModel(disease, options = {}) {
                 samples: result.metrics?.samples || 0,
                 result: {
                     modelWeights: result.weights,
+                    zkArtifact: result.zkArtifact || null,
                     metrics: {
                         accuracy: result.accuracy,
                         loss: result.loss,
@@ -195,6 +207,7 @@ async function trainLocalModel(disease, options = {}) {
 
         return {
             modelWeights: result.weights,
+            zkArtifact: result.zkArtifact || null,
             accuracy: result.accuracy,
             loss: result.loss,
             samplesTrained: result.metrics?.samples || sampleCount || 100,
@@ -243,6 +256,42 @@ function trainLocalModelSimplified(disease, patientData) {
 }
 
 
+/**
+ * Validate a client-supplied bulk export reference. Only files inside BULK_EXPORT_DIR
+ * (where the COPY ... TO exports are written) can be read.
+ * @param {Object} bulkExport - { file, format, chunkRows }; file is relative to BULK_EXPORT_DIR
+ * @returns {Object} { path, format, chunkRows } for train_model.py
+ */
+function resolveBulkExport(bulkExport) {
+    const file = bulkExport?.file || bulkExport?.path;
+    if (!file) {
+        throw new Error("bulkExport.file is required for the bulk_export data source");
+    }
+    const resolved = path.resolve(BULK_EXPORT_DIR, file);
+    const relative = path.relative(BULK_EXPORT_DIR, resolved);
+    if (!relative || relative.startsWith('..') || path.isAbsolute(relative)) {
+        throw new Error(`Bulk export must be inside ${BULK_EXPORT_DIR}`);
+    }
+    if (!fs.existsSync(resolved)) {
+        throw new Error(`Bulk export file not found: ${file}`);
+    }
+    if (bulkExport.format && !['csv', 'text', 'binary'].includes(bulkExport.format)) {
+        throw new Error(`Unknown bulk export format: ${bulkExport.format}`);
+    }
+    let chunkRows;
+    if (bulkExport.chunkRows !== undefined && bulkExport.chunkRows !== null) {
+        chunkRows = /^\d+$/.test(String(bulkExport.chunkRows).trim()) ? Number(bulkExport.chunkRows) : NaN;
+        if (!Number.isSafeInteger(chunkRows) || chunkRows <= 0) {
+            throw new Error(`Invalid bulk export chunkRows: ${bulkExport.chunkRows} (expected a positive integer)`);
+        }
+    }
+    return {
+        path: resolved,
+        format: bulkExport.format || null,
+        chunkRows
+    };
+}
+
 // ============================================
 // MODEL EVALUATION
 // ============================================
@@ -251,18 +300,28 @@ function trainLocalModelSimplified(disease, patientData) {
  * Evaluate model on test data
  * @param {Object} model - Model to evaluate
  * @param {Array} testData - Test dataset
+ * @param {Object} options - Evaluation options
+ * @param {string} options.disease - Disease type whose test split is used
+ * @param {Object} options.scalerStats - Inline federated scaling statistics
+ * @param {string} options.scalerStatsVersion - Dataset version of cached federated scaling statistics
  * @returns {Promise<Object>} Evaluation metrics
  */
-async function evaluateModel(model, testData) {
+async function evaluateModel(model, testData, options = {}) {
+    const { disease = null, scalerStats = null, scalerStatsVersion = null } = options;
+
     try {
         console.log("📊 Evaluating model...");
 
+        // Scale test features with the same statistics the round trained with
         const inputData = {
             model,
-            testData
+            testData,
+            disease,
+            ...(scalerStats ? { scalerStats } : {}),
+            ...(scalerStatsVersion ? { scalerStatsVersion } : {})
         };
 
-        const result = await callPythonML("evaluate_model.py", inputData);
+        const result = await runScheduledPythonML("evaluate_model.py", inputData);
 
         return {
             accuracy: result.accuracy,
@@ -283,6 +342,30 @@ async function evaluateModel(model, testData) {
 // FEDERATED AVERAGING (FedAvg)
 // ============================================
 
+// Averaged entries are numeric arrays, flat (packed MLP params) or nested (logistic
+// regression coef); shape tables and other metadata are carried over from the first update
+const MODEL_METADATA_KEYS = new Set(['layers', 'dtypes', 'feature_names']);
+
+function flattenWeights(value) {
+    return value.every(v => typeof v === 'number') ? value : value.flat(Infinity);
+}
+
+function isWeightTensor(key, value) {
+    return !MODEL_METADATA_KEYS.has(key) && Array.isArray(value) && value.length > 0 &&
+        flattenWeights(value).every(v => typeof v === 'number');
+}
+
+// Nest flat values back into the shape of `template`
+function reshapeLike(flat, template) {
+    let index = 0;
+    const fill = node => Array.isArray(node) ? node.map(fill) : flat[index++];
+    return fill(template);
+}
+
+function isTreeEnsemble(modelWeights) {
+    return modelWeights?.format === 'hist_gradient_boosting';
+}
+
 /**
  * Aggregate model updates using FedAvg algorithm
  * @param {Array} modelUpdates - Array of model updates from participants
@@ -294,6 +377,9 @@ function federatedAverage(modelUpdates) {
     if (modelUpdates.length === 0) {
         throw new Error("No model updates to aggregate");
     }
+    if (isTreeEnsemble(modelUpdates[0].modelWeights)) {
+        throw new Error("Gradient boosting models are merged, not averaged; use aggregateModelUpdates");
+    }
 
     // Calculate total samples for weighted averaging
     const totalSamples = modelUpdates.reduce((sum, update) => sum + update.samplesTrained, 0);
@@ -302,23 +388,46 @@ function federatedAverage(modelUpdates) {
     const firstModel = modelUpdates[0].modelWeights;
     const aggregatedModel = JSON.parse(JSON.stringify(firstModel));
 
-    // Zero out all weights
-    Object.keys(aggregatedModel).forEach(layer => {
-        aggregatedModel[layer] = aggregatedModel[layer].map(() => 0);
+    // Zeroed flat accumulators for all weights
+    const weightKeys = Object.keys(aggregatedModel).filter(layer => isWeightTensor(layer, aggregatedModel[layer]));
+    const sums = {};
+    weightKeys.forEach(layer => {
+        sums[layer] = new Float64Array(flattenWeights(aggregatedModel[layer]).length);
     });
 
     // Weighted average of all models
-    let aggregatedCM = [[0, 0], [0, 0]];
-    
     modelUpdates.forEach(update => {
         const weight = update.samplesTrained / totalSamples;
 
-        Object.keys(update.modelWeights).forEach(layer => {
-            update.modelWeights[layer].forEach((value, index) => {
-                aggregatedModel[layer][index] += value * weight;
+        weightKeys.forEach(layer => {
+            const values = Array.isArray(update.modelWeights[layer]) ? flattenWeights(update.modelWeights[layer]) : [];
+            if (values.length !== sums[layer].length) {
+                throw new Error(`Cannot average '${layer}': model updates have different shapes`);
+            }
+            values.forEach((value, index) => {
+                sums[layer][index] += value * weight;
             });
         });
+    });
+
+    weightKeys.forEach(layer => {
+        aggregatedModel[layer] = reshapeLike(sums[layer], aggregatedModel[layer]);
+    });
+
+    return summarizeAggregation(aggregatedModel, modelUpdates, totalSamples);
+}
+
+/**
+ * Aggregated metrics (mean of local metrics, summed confusion matrix) next to the global weights
+ * @param {Object} modelWeights - Aggregated global weights
+ * @param {Array} modelUpdates - Updates that went into them
+ * @param {number} totalSamples - Total samples across those updates
+ * @returns {Object} Aggregated global model
+ */
+function summarizeAggregation(modelWeights, modelUpdates, totalSamples) {
+    let aggregatedCM = [[0, 0], [0, 0]];
 
+    modelUpdates.forEach(update => {
         // Sum confusion matrix values (TP, FN, FP, TN)
         if (update.confusionMatrix && Array.isArray(update.confusionMatrix) && update.confusionMatrix.length === 2) {
             aggregatedCM[0][0] += (update.confusionMatrix[0][0] || 0);
@@ -339,7 +448,7 @@ function federatedAverage(modelUpdates) {
     console.log(`✅ Aggregation complete - Avg Accuracy: ${(avgAccuracy * 100).toFixed(2)}%`);
 
     return {
-        modelWeights: aggregatedModel,
+        modelWeights,
         accuracy: avgAccuracy,
         loss: avgLoss,
         precision: avgPrecision,
@@ -352,6 +461,48 @@ function federatedAverage(modelUpdates) {
     };
 }
 
+/**
+ * Merge gradient boosting ensembles (hist_boosting.py): trees shared from the previous
+ * global model are kept once, each site's new trees are scaled by its sample weight
+ * @param {Array} modelUpdates - Model updates whose weights are hist_gradient_boosting payloads
+ * @returns {Promise<Object>} Aggregated global model
+ */
+async function mergeTreeEnsembles(modelUpdates) {
+    console.log(`🌲 Merging ${modelUpdates.length} gradient boosting ensembles...`);
+
+    if (modelUpdates.length === 0) {
+        throw new Error("No model updates to aggregate");
+    }
+
+    const totalSamples = modelUpdates.reduce((sum, update) => sum + update.samplesTrained, 0);
+    const result = await callPythonML("hist_boosting.py", {
+        action: 'merge',
+        payloads: modelUpdates.map(update => update.modelWeights),
+        weights: modelUpdates.map(update => update.samplesTrained)
+    });
+    if (result.error) {
+        throw new Error(`Gradient boosting merge failed: ${result.error}`);
+    }
+
+    return summarizeAggregation(result, modelUpdates, totalSamples);
+}
+
+/**
+ * Aggregate a round's model updates with the method that fits their model type
+ * @param {Array} modelUpdates - Model updates from participants
+ * @param {Object} options - { robust: use Multi-Krum, f: Byzantine participants to tolerate }
+ * @returns {Promise<Object>} Aggregated global model
+ */
+async function aggregateModelUpdates(modelUpdates, { robust = false, f = 1 } = {}) {
+    if (modelUpdates.length > 0 && isTreeEnsemble(modelUpdates[0].modelWeights)) {
+        if (robust) {
+            console.warn("⚠️  Multi-Krum needs a distance between models; tree ensembles are merged without it");
+        }
+        return mergeTreeEnsembles(modelUpdates);
+    }
+    return robust ? byzantineRobustAggregation(modelUpdates, f) : federatedAverage(modelUpdates);
+}
+
 /**
  * Byzantine-robust aggregation (Multi-Krum algorithm)
  * @param {Array} modelUpdates - Model updates
@@ -412,9 +563,10 @@ function calculateModelSquaredDistance(model1, model2) {
     let sumSquaredDiff = 0;
     let count = 0;
 
-    Object.keys(model1).forEach(layer => {
-        model1[layer].forEach((value, index) => {
-            const diff = value - model2[layer][index];
+    Object.keys(model1).filter(layer => isWeightTensor(layer, model1[layer])).forEach(layer => {
+        const values2 = flattenWeights(model2[layer] || []);
+        flattenWeights(model1[layer]).forEach((value, index) => {
+            const diff = value - values2[index];
             sumSquaredDiff += diff * diff;
             count++;
         });
@@ -562,6 +714,316 @@ async function downloadModelFromIPFS(cid) {
     }
 }
 
+// ============================================
+// LOCAL MODEL STORE (warm-start cache)
+// ============================================
+
+function storeKey(modelId) {
+    // Same sanitisation as model_store.py's _safe_name so both sides resolve the same directory
+    return String(modelId).replace(/[^A-Za-z0-9_.-]/g, '_');
+}
+
+/**
+ * Save an aggregated global model into the local versioned model store
+ * @param {string} modelId - Model ID
+ * @param {number} round - Round number the model was aggregated in
+ * @param {Object} modelWeights - Aggregated weights
+ * @param {string} cid - IPFS CID of the same model (used to match warm-start requests)
+ * @returns {Promise<Object>} Store result from Python
+ */
+async function storeGlobalModelVersion(modelId, round, modelWeights, cid) {
+    const result = await callPythonML("model_store.py", {
+        action: 'put',
+        root: MODEL_STORE_DIR,
+        modelId: storeKey(modelId),
+        round: parseInt(round),
+        weights: modelWeights,
+        metadata: { cid }
+    });
+    if (result.error) {
+        throw new Error(`Model store write failed: ${result.error}`);
+    }
+    return result;
+}
+
+/**
+ * Find the stored version of a global model by its IPFS CID
+ * @param {string} modelId - Model ID
+ * @param {string} cid - Expected global model CID (fl_models.global_model_ipfs)
+ * @returns {Object|null} { modelId, round } reference for train_model.py, or null if not stored locally
+ */
+function getStoredGlobalModelRef(modelId, cid) {
+    const modelDir = path.join(MODEL_STORE_DIR, storeKey(modelId));
+    let roundDirs;
+    try {
+        // Newest first; the CID may name any retained version, e.g. after a rollback
+        roundDirs = fs.readdirSync(modelDir).filter(name => /^round_\d+$/.test(name)).sort().reverse();
+    } catch {
+        return null;
+    }
+    for (const roundDir of roundDirs) {
+        try {
+            const manifest = JSON.parse(fs.readFileSync(path.join(modelDir, roundDir, "manifest.json"), "utf8"));
+            if (manifest.metadata?.cid === cid) {
+                return { modelId: storeKey(modelId), round: manifest.round };
+            }
+        } catch {
+            // Version being written or retired; skip it
+        }
+    }
+    return null;
+}
+
+/**
+ * Roll the local store back to an earlier global model version
+ * @param {string} modelId - Model ID
+ * @param {number} round - Stored round to make current
+ * @returns {Promise<Object>} { round, cid } of the restored version; the caller points fl_models at the CID
+ */
+async function rollbackGlobalModelVersion(modelId, round) {
+    const result = await callPythonML("model_store.py", {
+        action: 'rollback',
+        root: MODEL_STORE_DIR,
+        modelId: storeKey(modelId),
+        round: parseInt(round)
+    });
+    if (result.error) {
+        throw new Error(`Model store rollback failed: ${result.error}`);
+    }
+    return { round: result.current, cid: result.metadata?.cid || null };
+}
+
+// ============================================
+// FEDERATED FEATURE SCALING
+// ============================================
+
+/**
+ * Compute this site's per-feature count/mean/M2 summary (no rows are shared)
+ * @param {string} disease - Disease type
+ * @param {Object} options - { dataSource, sampleCount, bulkExport, customData } as for training
+ * @returns {Promise<Object>} { count, mean, m2, featureSpace }
+ */
+async function computeLocalScalerStats(disease, options = {}) {
+    const result = await callPythonML("scaler_stats.py", { action: 'local', disease, ...options });
+    if (result.error) {
+        throw new Error(`Scaling statistics failed: ${result.error}`);
+    }
+    return result;
+}
+
+/**
+ * Merge site summaries into global scaling statistics and cache them per disease, feature space and dataset version
+ * @param {string} disease - Disease type
+ * @param {string} datasetVersion - Version key later passed to training as scalerStatsVersion
+ * @param {Array<Object>} summaries - Results of computeLocalScalerStats from each site
+ * @param {string} featureSpace - 'kaggle' or 'records' (medical records and bulk exports)
+ * @returns {Promise<Object>} Merged { count, mean, var, sites, ... }
+ */
+async function mergeScalerStats(disease, datasetVersion, summaries, featureSpace = 'kaggle') {
+    const result = await callPythonML("scaler_stats.py", { action: 'merge', disease, datasetVersion, featureSpace, summaries });
+    if (result.error) {
+        throw new Error(`Scaling statistics merge failed: ${result.error}`);
+    }
+    return result;
+}
+
+/**
+ * Scaling statistics version used by every site training in a round
+ * @param {number|string} roundId - Round ID
+ * @returns {string} scalerStatsVersion for train/evaluate
+ */
+function roundScalerStatsVersion(roundId) {
+    return `round-${roundId}`;
+}
+
+/**
+ * Summarise this server's data and merge it with summaries sent by other sites,
+ * caching the global statistics under the round's version. Kaggle data and
+ * record-derived features have different columns, so each feature space gets its own
+ * statistics and training picks the one matching its data source.
+ * @param {string} disease - Disease type
+ * @param {number|string} roundId - Round ID
+ * @param {Array<Object>} siteSummaries - computeLocalScalerStats results from other sites
+ * @returns {Promise<Object>} { scalerStatsVersion, featureSpaces: { [space]: { count, sites } } }
+ */
+async function prepareRoundScalerStats(disease, roundId, siteSummaries = []) {
+    const scalerStatsVersion = roundScalerStatsVersion(roundId);
+    const bySpace = { kaggle: [], records: [] };
+
+    try {
+        bySpace.kaggle.push(await computeLocalScalerStats(disease));
+    } catch (err) {
+        console.warn(`⚠️ No local Kaggle scaling summary for ${disease}: ${err.message}`);
+    }
+    try {
+        const extracted = await featureExtractor.extractFeaturesForDisease(disease);
+        if (extracted.features.length > 0) {
+            bySpace.records.push(await computeLocalScalerStats(disease, {
+                dataSource: 'medical_records',
+                customData: { features: extracted.features }
+            }));
+        }
+    } catch (err) {
+        console.warn(`⚠️ No local medical record scaling summary for ${disease}: ${err.message}`);
+    }
+
+    siteSummaries.forEach(summary => {
+        const space = summary?.featureSpace || 'kaggle';
+        if (!bySpace[space]) {
+            throw new Error(`Unknown feature space in site summary: ${space}`);
+        }
+        bySpace[space].push(summary);
+    });
+
+    const featureSpaces = {};
+    for (const [space, summaries] of Object.entries(bySpace)) {
+        if (summaries.length === 0) continue;
+        const merged = await mergeScalerStats(disease, scalerStatsVersion, summaries, space);
+        featureSpaces[space] = { count: merged.count, sites: merged.sites };
+        console.log(`📐 Federated ${space} scaling statistics for round ${roundId}: ${merged.sites} site(s), ${merged.count} rows`);
+    }
+    return { scalerStatsVersion, featureSpaces };
+}
+
+// ============================================
+// ZK ARTIFACTS
+// ============================================
+
+/**
+ * Commitment artifact for submitted weights, rebuilt server-side by zk_artifact.py.
+ * A client-supplied artifact is only accepted if it encodes exactly these weights.
+ * @param {Object} modelWeights - Weights as submitted (extract_weights format)
+ * @param {Object} [clientArtifact] - zkArtifact returned by local training, if any
+ * @returns {Promise<Object>} Artifact to feed the proof
+ */
+async function buildZkArtifact(modelWeights, clientArtifact = null) {
+    if (clientArtifact) {
+        const result = await callPythonML("zk_artifact.py", { action: 'verify', weights: modelWeights, artifact: clientArtifact });
+        if (result.error) {
+            throw new Error(`ZK artifact check failed: ${result.error}`);
+        }
+        if (!result.valid) {
+            const error = new Error(`ZK artifact does not match submitted weights: ${result.reason}`);
+            error.code = 'ZK_ARTIFACT_MISMATCH';
+            throw error;
+        }
+        return result.artifact;
+    }
+
+    const result = await callPythonML("zk_artifact.py", { action: 'build', weights: modelWeights });
+    if (result.error) {
+        throw new Error(`ZK artifact build failed: ${result.error}`);
+    }
+    return result;
+}
+
+// ============================================
+// TRAINING SCHEDULER
+// ============================================
+
+// Train/evaluate jobs from all institutions go through one long-lived job_scheduler.py
+// process: a bounded worker pool with memory admission control and BLAS/OpenMP thread
+// limits per job. Set HL_SCHEDULER=off to spawn one process per request instead.
+const SCHEDULER_ENABLED = process.env.HL_SCHEDULER !== 'off';
+const schedulerRequests = new Map(); // requestId -> { resolve, reject }
+let schedulerShell = null;
+let schedulerRequestSeq = 0;
+
+function failSchedulerRequests(error) {
+    schedulerRequests.forEach(({ reject }) => reject(error));
+    schedulerRequests.clear();
+}
+
+function getSchedulerShell() {
+    if (schedulerShell) return schedulerShell;
+
+    const shell = new PythonShell("job_scheduler.py", {
+        mode: 'text',
+        pythonPath: process.env.PYTHON_PATH || (process.platform === 'win32' ? 'python' : 'python3'),
+        pythonOptions: ['-u'],
+        scriptPath: ML_BACKEND_DIR,
+        args: ['--serve']
+    });
+
+    shell.on('message', (line) => {
+        let event;
+        try {
+            event = JSON.parse(line);
+        } catch {
+            return;
+        }
+        const pending = schedulerRequests.get(event.requestId);
+        if (!pending) {
+            if (event.event === 'error') console.warn(`⚠️ Scheduler: ${event.error}`);
+            return;
+        }
+        schedulerRequests.delete(event.requestId);
+        if (event.event === 'done') {
+            console.log(`🗂️ Scheduler job ${String(event.jobId).slice(0, 8)} ${event.status} (waited ${(event.waitTime || 0).toFixed(1)}s)`);
+            pending.resolve(event.result);
+        } else if (event.event === 'metrics') {
+            pending.resolve(event.metrics);
+        } else if (event.event === 'cancelled') {
+            pending.resolve(event.cancelled);
+        } else {
+            pending.reject(new Error(event.error || 'Scheduler error'));
+        }
+    });
+
+    shell.on('stderr', (stderr) => {
+        console.warn(`[SCHEDULER] ${stderr}`);
+    });
+
+    const onExit = (err) => {
+        if (schedulerShell === shell) schedulerShell = null;
+        failSchedulerRequests(new Error(`Training scheduler exited${err ? `: ${err.message || err}` : ''}`));
+    };
+    shell.on('close', () => onExit());
+    shell.on('error', onExit);
+    shell.on('pythonError', onExit);
+
+    schedulerShell = shell;
+    return shell;
+}
+
+function sendSchedulerCommand(command) {
+    const requestId = `${process.pid}-${++schedulerRequestSeq}`;
+    return new Promise((resolve, reject) => {
+        schedulerRequests.set(requestId, { resolve, reject });
+        try {
+            getSchedulerShell().send(JSON.stringify({ ...command, requestId }));
+        } catch (err) {
+            schedulerRequests.delete(requestId);
+            reject(new Error(`Failed to reach training scheduler: ${err.message}`));
+        }
+    });
+}
+
+/**
+ * Run a train/evaluate script through the shared scheduler queue
+ * @param {string} scriptName - Python script name
+ * @param {Object} inputData - Input payload
+ * @param {number} priority - Lower runs first
+ * @returns {Promise<Object>} Script result (same contract as callPythonML)
+ */
+async function runScheduledPythonML(scriptName, inputData, priority = 0) {
+    if (!SCHEDULER_ENABLED) {
+        return callPythonML(scriptName, inputData);
+    }
+    return sendSchedulerCommand({ action: 'submit', script: scriptName, payload: inputData, priority });
+}
+
+/**
+ * Queue depth, wait times, memory in use and worker/thread configuration of the scheduler
+ * @returns {Promise<Object>} Scheduler metrics
+ */
+async function getSchedulerMetrics() {
+    if (!SCHEDULER_ENABLED) {
+        return { enabled: false };
+    }
+    return { enabled: true, ...(await sendSchedulerCommand({ action: 'metrics' })) };
+}
+
 // ============================================
 // PYTHON BRIDGE
 // ============================================
@@ -658,6 +1120,7 @@ module.exports = {
     evaluateModel,
 
     // Aggregation
+    aggregateModelUpdates,
     federatedAverage,
     byzantineRobustAggregation,
     calculateModelSquaredDistance,
@@ -670,6 +1133,27 @@ module.exports = {
     uploadModelToIPFS,
     downloadModelFromIPFS,
 
+    // Training scheduler
+    runScheduledPythonML,
+    getSchedulerMetrics,
+
+    // Bulk export ingestion
+    resolveBulkExport,
+
+    // Local model store
+    storeGlobalModelVersion,
+    getStoredGlobalModelRef,
+    rollbackGlobalModelVersion,
+
+    // Federated feature scaling
+    computeLocalScalerStats,
+    mergeScalerStats,
+    roundScalerStatsVersion,
+    prepareRoundScalerStats,
+
+    // ZK artifacts
+    buildZkArtifact,
+
     // Training Status
     getTrainingStatus,
     setTrainingStatus,
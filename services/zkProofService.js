@@ -26,10 +26,15 @@ async function generateProof(modelWeights, trainingMetrics) {
         console.log("🔐 Generating ZK proof for model training...");
 
         // Production-ready data preparation
-        // We take a subset of weights for the prototype hashing
-        const weightSubset = Array.isArray(modelWeights.output)
-            ? modelWeights.output.slice(0, 10).map(w => Math.floor(w * 1000000))
-            : Array(10).fill(0);
+        // Prefer the field-encoded weights produced by the ML backend (zk_artifact.py) —
+        // they come with a commitment over the full model. Otherwise fall back to
+        // fixed-point encoding a subset of the JSON weights here.
+        const artifactInputs = trainingMetrics.zkArtifact?.circuitInputs?.modelWeightsRaw;
+        const weightSubset = Array.isArray(artifactInputs)
+            ? artifactInputs.slice(0, 10).map(w => BigInt(w))
+            : Array.isArray(modelWeights.output)
+                ? modelWeights.output.slice(0, 10).map(w => Math.floor(w * 1000000))
+                : Array(10).fill(0);
 
         while (weightSubset.length < 10) weightSubset.push(0);
 